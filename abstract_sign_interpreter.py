@@ -1,7 +1,7 @@
 import jpamb
 from jpamb import jvm
+from array import array
 from dataclasses import dataclass
-import copy
 import math
 
 import sign
@@ -14,9 +14,9 @@ logger.add(sys.stderr, format="[{level}] {message}")
 
 methodid, input = jpamb.getcase()
 
-### Work here 
+### Work here
 
-@dataclass
+@dataclass(slots=True)
 class PC:
     method: jvm.AbsMethodID
     offset: int
@@ -25,9 +25,6 @@ class PC:
         self.offset += delta
         return self
 
-    def __add__(self, delta):
-        return PC(self.method, self.offset + delta)
-
     def __str__(self):
         return f"{self.method}:{self.offset}"
 
@@ -40,458 +37,635 @@ def bind_args_to_locals(frame, args):
         else:
             local_index += 1
 
-@dataclass
+@dataclass(slots=True)
 class Bytecode:
     suite: jpamb.Suite
-    methods: dict[jvm.AbsMethodID, list[jvm.Opcode]]
-
-    def __getitem__(self, pc: PC) -> jvm.Opcode:
+    methods: dict[jvm.AbsMethodID, list]
+    _last_method: jvm.AbsMethodID | None = None
+    _last_opcodes: list | None = None
+
+    def __getitem__(self, pc: PC) -> tuple:
+        # identity check on the last fetched method; consecutive fetches
+        # almost always hit the same method, skipping the dict lookup
+        if pc.method is self._last_method:
+            return self._last_opcodes[pc.offset]
         try:
-            opcodes = self.methods[pc.method]
+            code = self.methods[pc.method]
         except KeyError:
-            opcodes = list(self.suite.method_opcodes(pc.method))
-            self.methods[pc.method] = opcodes
-
-        return opcodes[pc.offset]
-
-
-@dataclass
-class Stack[T]:
-    items: list[T]
-
-    def __bool__(self) -> bool:
-        return len(self.items) > 0
-
-    @classmethod
-    def empty(cls):
-        return cls([])
+            code = [_translate(opr) for opr in self.suite.method_opcodes(pc.method)]
+            self.methods[pc.method] = code
 
-    def peek(self) -> T:
-        return self.items[-1]
-
-    def pop(self) -> T:
-        return self.items.pop(-1)
-
-    def push(self, value):
-        self.items.append(value)
-        return self
-
-    def __str__(self):
-        if not self:
-            return "ϵ"
-        return "".join(f"{v}" for v in self.items)
+        self._last_method = pc.method
+        self._last_opcodes = code
+        return code[pc.offset]
 
 
 suite = jpamb.Suite()
 bc = Bytecode(suite, dict())
 
 
-@dataclass
+@dataclass(slots=True)
 class Frame:
-    locals: dict[int, jvm.Value]
-    stack: Stack[jvm.Value]
+    locals: list[jvm.Value | None]
+    stack: list[jvm.Value]
     pc: PC
 
     def __str__(self):
-        locals = ", ".join(f"{k}:{v}" for k, v in sorted(self.locals.items()))
-        return f"<{{{locals}}}, {self.stack}, {self.pc}>"
+        locals = ", ".join(f"{k}:{v}" for k, v in enumerate(self.locals) if v is not None)
+        stack = "".join(f"{v}" for v in self.stack) or "ϵ"
+        return f"<{{{locals}}}, {stack}, {self.pc}>"
 
     def from_method(method: jvm.AbsMethodID) -> "Frame":
-        return Frame({}, Stack.empty(), PC(method, 0))
+        return Frame([None] * 16, [], PC(method, 0))
 
 
-@dataclass
+@dataclass(slots=True)
 class State:
     heap: dict[int, jvm.Value]
-    frames: Stack[Frame]
+    frames: list[Frame]
+    result: str | None = None
 
     def __str__(self):
-        return f"{self.heap} {self.frames}"
-
-
-def step(state: State) -> State | str:
-    assert isinstance(state, State), f"expected frame but got {state}"
-    frame = state.frames.peek()
-    opr = bc[frame.pc]
-    match opr:
-        case jvm.Push(value=v):
-            frame.stack.push(v)
-            frame.pc += 1
+        frames = "".join(f"{f}" for f in self.frames) or "ϵ"
+        return f"{self.heap} {frames}"
+
+
+# One handler per opcode type, dispatched through HANDLERS below instead of
+# walking a match ladder for every single instruction.
+
+def _op_push(state, frame, opr):
+    frame.stack.append(opr.value)
+    frame.pc.offset += 1
+    return state
+
+
+def _op_load(state, frame, opr):
+    t = opr.type
+    v = frame.locals[opr.index]
+    if isinstance(t, jvm.Int) or isinstance(t, jvm.Reference) or isinstance(t, jvm.Double):
+        frame.stack.append(v)
+    else:
+        raise NotImplementedError(f"Unhandled load type: {t}")
+    frame.pc.offset += 1
+    return state
+
+
+def _op_array_load(state, frame, opr):
+    stk = frame.stack
+    index = stk.pop().value
+    arr = stk.pop()
+    if not isinstance(arr, (list, array)):
+        raise RuntimeError(f"Expected array, got {arr}")
+    if isinstance(index, sign.SignSet):
+        frame.pc.offset += 1
+        return state
+    elif index < 0 or index >= len(arr):
+        state.result = "out of bounds"
+        return state
+    stk.append(jvm.Value.int(arr[index]))
+    frame.pc.offset += 1
+    return state
+
+
+def _op_array_store(state, frame, opr):
+    stk = frame.stack
+    if not isinstance(opr.type, jvm.Int):
+        raise NotImplementedError(f"Don't know how to handle: {opr!r}")
+    val = stk.pop()
+    index = stk.pop().value
+    arr = stk.pop()
+    if not isinstance(arr, (list, array)):
+        raise RuntimeError(f"Expected array, got {arr}")
+    if index < 0 or index >= len(arr):
+        state.result = "out of bounds"
+        return state
+    arr[index] = val.value
+    frame.pc.offset += 1
+    return state
+
+
+def _op_array_length(state, frame, opr):
+    stk = frame.stack
+    arr = stk.pop()
+    if not isinstance(arr, (list, array)):
+        raise RuntimeError(f"Expected array, got {arr}")
+    stk.append(jvm.Value.int(len(arr)))
+    frame.pc.offset += 1
+    return state
+
+
+### Integer operations
+
+def _op_incr(state, frame, opr):
+    v = frame.locals[opr.index]
+    amt = opr.amount
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if not isinstance(amt, sign.SignSet):
+        amt = sign.SignSet.abstract_value(amt)
+
+    frame.locals[opr.index] = v.add(amt)
+    frame.pc.offset += 1
+    return state
+
+
+# secondary dispatch table for Binary, keyed on the operant
+_BINARY_OPS = {
+    jvm.BinaryOpr.Div: sign.SignSet.div,
+    jvm.BinaryOpr.Add: sign.SignSet.add,
+    jvm.BinaryOpr.Sub: sign.SignSet.sub,
+    jvm.BinaryOpr.Mul: sign.SignSet.mult,
+    jvm.BinaryOpr.Rem: sign.SignSet.rem,
+}
+
+
+def _op_binary(state, frame, opr):
+    stk = frame.stack
+    v2, v1 = stk.pop(), stk.pop()
+
+    if not isinstance(v1, sign.SignSet):
+        v1: sign.SignSet = sign.SignSet.abstract_value( v1.value)
+    if not isinstance(v2, sign.SignSet):
+        v2: sign.SignSet = sign.SignSet.abstract_value( v2.value)
+
+    try:
+        op = _BINARY_OPS[opr.operant]
+    except KeyError:
+        raise NotImplementedError(f"Unhandled integer binary op: {opr.operant}")
+
+    stk.append(op(v1, v2))
+    frame.pc.offset += 1
+    return state
+
+
+def _op_return(state, frame, opr):
+    if opr.type is None:
+        state.frames.pop()
+        if state.frames:
             return state
-        
-        case jvm.Load(type=t, index=i):
-            v = frame.locals[i]
-            if isinstance(t, jvm.Int) or isinstance(t, jvm.Reference) or isinstance(t, jvm.Double):
-                frame.stack.push(v)
-            else:
-                raise NotImplementedError(f"Unhandled load type: {t}")
-            frame.pc += 1
+        else:
+            state.result = "ok"
             return state
+    v1 = frame.stack.pop()
+    state.frames.pop()
+    if state.frames:
+        state.frames[-1].stack.append(v1)
+        return state
+    else:
+        state.result = "ok"
+        return state
 
-        case jvm.ArrayLoad():
-            index = frame.stack.pop().value
-            arr = frame.stack.pop()
-            if not isinstance(arr, list):
-                raise RuntimeError(f"Expected array, got {arr}")
-            if isinstance(index, sign.SignSet):
-                frame.pc += 1
-                return state
-            elif index < 0 or index >= len(arr):
-                return "out of bounds"
-            frame.stack.push(jvm.Value.int(arr[index]))
-            frame.pc += 1
-            return state
 
-        case jvm.ArrayStore(type=jvm.Int()):
-            val = frame.stack.pop()
-            index = frame.stack.pop().value
-            arr = frame.stack.pop()
-            if not isinstance(arr, list):
-                raise RuntimeError(f"Expected array, got {arr}")
-            if index < 0 or index >= len(arr):
-                return "out of bounds"
-            arr[index] = val.value
-            frame.pc += 1
-            return state
-        
-        case jvm.ArrayLength():
-            arr = frame.stack.pop()
-            if not isinstance(arr, list):
-                raise RuntimeError(f"Expected array, got {arr}")
-            frame.stack.push(jvm.Value.int(len(arr)))
-            frame.pc += 1
-            return state
-        
-        ### Integer operations
-
-        case jvm.Incr(index=i, amount=amt):
-            v = frame.locals[i]
-            if not isinstance(v, sign.SignSet):
-                v: sign.SignSet = sign.SignSet.abstract_value( v.value)
-            if not isinstance(amt, sign.SignSet):
-                amt: sign.SignSet = sign.SignSet.abstract_value( amt)
-            
-            v = v.add(sign.SignSet.abstract_value( amt))
-            frame.pc += 1
-            return state
-        
-        case jvm.Binary(type=jvm.Int() | sign.SignSet | jvm.Double(), operant=oper):
-            v2, v1 = frame.stack.pop(), frame.stack.pop()
-
-            if not isinstance(v1, sign.SignSet):
-                v1: sign.SignSet = sign.SignSet.abstract_value( v1.value)
-            if not isinstance(v2, sign.SignSet):
-                v2: sign.SignSet = sign.SignSet.abstract_value( v2.value)
-
-            if oper == jvm.BinaryOpr.Div:
-                res = v1.div(v2)
-            elif oper == jvm.BinaryOpr.Add:
-                res = v1.add(v2)
-            elif oper == jvm.BinaryOpr.Sub:
-                res = v1.sub(v2)
-            elif oper == jvm.BinaryOpr.Mul:
-                res = v1.mult(v2)
-            elif oper == jvm.BinaryOpr.Rem:
-                res = v1.rem(v2)
-            else:
-                raise NotImplementedError(f"Unhandled integer binary op: {oper}")
-
-            frame.stack.push(res)
-            frame.pc += 1
-            return state
-        
-        case jvm.Return(type=jvm.Int()):
-            v1 = frame.stack.pop()
-            state.frames.pop()
-            if state.frames:
-                state.frames.peek().stack.push(v1)
-                return state
-            else:
-                return "ok"
-        
-        case jvm.Return(type=None):
-            state.frames.pop()
-            if state.frames:
-                return state
-            else:
-                return "ok"
-        case jvm.New(classname=classname):
-            frame.stack.push(classname)
-            frame.pc += 1
-            return state 
-        
-        case jvm.InvokeSpecial(method=method):
-            frame.pc += 1
-            return state       
-        
-        case jvm.InvokeStatic(method=method):
-            arg_count = len(method.methodid.params._elements)
-            args = []
-            for _ in range(arg_count):
-                args.append(frame.stack.pop())
-            args.reverse()
-
-            newframe = Frame.from_method(method)
-            for i, arg in enumerate(args):
-                newframe.locals[i] = arg
-
-            state.frames.push(newframe)
-            frame.pc += 1
+def _op_new(state, frame, opr):
+    frame.stack.append(opr.classname)
+    frame.pc.offset += 1
+    return state
 
-            return state
-        
-        case jvm.InvokeDynamic(offset=offset, stack_size=stack_size):
-            args = []
-            for _ in range(stack_size):
-                args.append(frame.stack.pop())
 
-            args.reverse()
-        
-            frame.stack.push(jvm.Value(jvm.String(), "<dyn-string>"))
+def _op_invoke_special(state, frame, opr):
+    frame.pc.offset += 1
+    return state
 
-            frame.pc += 1
-            return state
-        
-        case jvm.InvokeVirtual(method=m):
-            cname = m.classname.dotted()
-            mname = m.methodid.name
 
-            if (cname in ("java/lang/String", "java.lang.String")
-                    and mname == "length"):
-                frame.stack.pop()
-                frame.stack.push(jvm.Value.int(1)) 
+def _op_invoke_static(state, frame, opr):
+    stk = frame.stack
+    method = opr.method
+    arg_count = opr._arg_count
+    if arg_count:
+        # one C-level slice + delete; already in left-to-right order
+        args = stk[-arg_count:]
+        del stk[-arg_count:]
+    else:
+        args = []
 
-                frame.pc += 1
-                return state
+    newframe = Frame.from_method(method)
+    for i, arg in enumerate(args):
+        newframe.locals[i] = arg
 
-            arg_count = len(m.methodid.params._elements) + 1
+    state.frames.append(newframe)
+    frame.pc.offset += 1
 
-            args: list[jvm.Value] = []
-            for _ in range(arg_count):
-                args.append(frame.stack.pop())
-            args.reverse()
+    return state
 
-            newframe = Frame.from_method(m)
-            for i, arg in enumerate(args):
-                newframe.locals[i] = arg
 
-            state.frames.push(newframe)
-            frame.pc += 1
-            return state
-        
-        
-
-        case jvm.CompareFloating(type=t, mode=mode):
-            v2 = frame.stack.pop()
-            v1 = frame.stack.pop()
-
-            def as_number(v):
-                if isinstance(v, jvm.Value):
-                    if isinstance(
-                        v.type,
-                        (
-                            jvm.Double,
-                            jvm.Float,
-                            jvm.Int,
-                            jvm.Long,
-                            jvm.Short,
-                            jvm.Byte,
-                        ),
-                    ):
-                        return v.value
-                    return None
-
-                if v.__class__.__name__ == "SignSet":
-                    return 0.0
-
-                if isinstance(v, (int, float)):
-                    return v
-                return None
-
-            x = as_number(v1)
-            y = as_number(v2)
-
-            
-            if x is None or y is None:
-                frame.stack.push(jvm.Value.int(0))
-                frame.pc += 1
-                return state
-
-            import math
-
-            m = (mode or "").lower()
-            is_less_variant = m in ("l", "lt", "less", "cmpl")
-            is_great_variant = m in ("g", "gt", "greater", "cmpg")
-
-            nan = (
-                isinstance(x, float) and math.isnan(x)
-            ) or (
-                isinstance(y, float) and math.isnan(y)
-            )
-
-            if nan:
-                if is_less_variant:
-                    res = -1
-                else:
-                    res = 1
-            else:
-                if x < y:
-                    res = -1
-                elif x > y:
-                    res = 1
-                else:
-                    res = 0
-
-            frame.stack.push(jvm.Value.int(res))
-            frame.pc += 1
-            return state
-        
-        case jvm.Throw():
-            v1 = frame.stack.pop()
-            if str(v1) == "java/lang/AssertionError":
-                return "assertion error"
-            return str(v1)
-
-        case jvm.Dup():
-            if not frame.stack:
-                raise RuntimeError("stack underflow on dup")
-            v = frame.stack.peek()
-            cv = copy.copy(v)
-            frame.stack.push(cv)
-            frame.pc += 1
-            return state
-        case jvm.Store(type=t, index=i):
-            v = frame.stack.pop()
-            if isinstance(t, jvm.Int) or isinstance(t, jvm.Reference) or isinstance(t, jvm.Double):
-                frame.locals[i] = v
-            elif isinstance(t, sign.SignSet):
-                frame.locals[i] = v
-            else:
-                raise NotImplementedError(f"Unhandled store type: {t}")
-            frame.pc += 1
-            return state
-   
-        case jvm.Get(field=field):
-            assert (field.extension.name == "$assertionsDisabled"), f"unknown field {field}"
-            frame.stack.push(jvm.Value.boolean(False))
-            frame.pc += 1
-            return state
-        case jvm.Ifz(condition=cond, target=target):
-            v = frame.stack.pop()
-
-            if not isinstance(v, sign.SignSet):
-                v: sign.SignSet = sign.SignSet.abstract_value(v.value)
-
-            take_branch = False
-            if cond == "eq":
-                take_branch = (v.contains("0"))
-            elif cond == "ne":
-                take_branch = (not v.contains("0"))
-            elif cond == "lt":
-                take_branch = (v.contains("-"))
-            elif cond == "gt":
-                take_branch = (v.contains("+"))
-            elif cond == "ge":
-                take_branch = (v.contains("0") or v.contains("+"))
-            elif cond == "le":
-                take_branch = (v.contains("0") or v.contains("-"))
-            else:
-                raise NotImplementedError(f"Unhandled ifz condition: {cond}")
-
-            if take_branch:
-                frame.pc = PC(frame.pc.method, target)
-            else:
-                frame.pc += 1
-            return state
+def _op_invoke_dynamic(state, frame, opr):
+    stk = frame.stack
+    if opr.stack_size:
+        del stk[-opr.stack_size:]
 
-        case jvm.If(condition=cond, target=target):
-            # Pop right, then left (same order as your concrete interpreter)
-            v2 = frame.stack.pop()
-            v1 = frame.stack.pop()
+    stk.append(jvm.Value(jvm.String(), "<dyn-string>"))
 
-            # --- Normalise both to SignSet ---
+    frame.pc.offset += 1
+    return state
 
-            if not isinstance(v1, sign.SignSet):
-                v1 = sign.SignSet.abstract_value(v1.value)
-                
-            if not isinstance(v2, sign.SignSet):
-                v2 = sign.SignSet.abstract_value(v2.value)
 
-            def has(s: sign.SignSet, sym: str) -> bool:
-                return sym in s.signs
+def _op_invoke_virtual(state, frame, opr):
+    stk = frame.stack
+    m = opr.method
 
+    if opr._is_string_length:
+        stk.pop()
+        stk.append(jvm.Value.int(1))
 
-            if cond == "eq":
-                take_branch = not v1.signs.isdisjoint(v2.signs)
+        frame.pc.offset += 1
+        return state
 
-            elif cond == "ne":
-                take_branch = v1.signs != v2.signs
+    arg_count = opr._arg_count
 
-            elif cond == "lt":
-                take_branch = has(v1, "-") and (has(v2, "0") or has(v2, "+"))
+    args: list[jvm.Value] = stk[-arg_count:]
+    del stk[-arg_count:]
 
-            elif cond == "le":
-                take_branch = has(v1, "-") or has(v1, "0")
+    newframe = Frame.from_method(m)
+    for i, arg in enumerate(args):
+        newframe.locals[i] = arg
 
-            elif cond == "ge":
-                take_branch = has(v1, "+") or has(v1, "0")
+    state.frames.append(newframe)
+    frame.pc.offset += 1
+    return state
 
-            elif cond == "gt":
-                if v2.signs == {"-"}:
-                    take_branch = True
-                else:
-                    take_branch = has(v1, "+") and not has(v2, "+")
-            else:
-                raise NotImplementedError(f"Unhandled If condition: {cond}")
-            
-            print(take_branch)
-            if take_branch:
-                frame.pc = PC(frame.pc.method, target)
-            else:
-                frame.pc += 1
-            return state
-        
-        case jvm.Goto(target=t):
-            assert isinstance(t, int), f"unknown target {t}"
-            frame.pc = PC(frame.pc.method, t)
-            return state
-        
-        case jvm.Cast(from_=from_, to_ = to_):
-            v1 = frame.stack.pop()
-            i = v1.value
-            frame.pc += 1
-            match to_:
-                case jvm.Short():
-                    frame.stack.push(i)
-                case _:
-                    raise NotImplementedError(f"Unhandled If condition: {cond}")
-            return state
-        
-        case jvm.NewArray(type=t, dim=1):
-            size = frame.stack.pop().value
-            if size < 0:
-                return "out of bounds"
-            arr = [0] * size
-            frame.stack.push(arr)
-            frame.pc += 1
-            return state
-        
-        case a:
-            raise NotImplementedError(f"Don't know how to handle: {a!r}")
-
-
-frame = Frame.from_method(methodid)
-bind_args_to_locals(frame, input.values)
-
-state = State({}, Stack.empty().push(frame))
-
-for x in range(1000):
-    state = step(state)
-    print(state)
-    if isinstance(state, str):
-        print(state)
-        break
-    else: 
-        print("STATE: ",state)
-else:
-    print("*")
\ No newline at end of file
+
+_LESS_MODES = frozenset(("l", "lt", "less", "cmpl"))
+_GREAT_MODES = frozenset(("g", "gt", "greater", "cmpg"))
+
+
+_NUMERIC_TYPES = (jvm.Double, jvm.Float, jvm.Int, jvm.Long, jvm.Short, jvm.Byte)
+
+
+def _as_number(v):
+    if isinstance(v, jvm.Value):
+        if isinstance(v.type, _NUMERIC_TYPES):
+            return v.value
+        return None
+
+    if isinstance(v, sign.SignSet):
+        return 0.0
+
+    if isinstance(v, (int, float)):
+        return v
+    return None
+
+
+def _op_compare_floating(state, frame, opr):
+    stk = frame.stack
+    mode = opr.mode
+    v2 = stk.pop()
+    v1 = stk.pop()
+
+    x = _as_number(v1)
+    y = _as_number(v2)
+
+
+    if x is None or y is None:
+        stk.append(jvm.Value.int(0))
+        frame.pc.offset += 1
+        return state
+
+    m = (mode or "").lower()
+    is_less_variant = m in _LESS_MODES
+    is_great_variant = m in _GREAT_MODES
+
+    nan = (
+        isinstance(x, float) and math.isnan(x)
+    ) or (
+        isinstance(y, float) and math.isnan(y)
+    )
+
+    if nan:
+        if is_less_variant:
+            res = -1
+        else:
+            res = 1
+    else:
+        if x < y:
+            res = -1
+        elif x > y:
+            res = 1
+        else:
+            res = 0
+
+    stk.append(jvm.Value.int(res))
+    frame.pc.offset += 1
+    return state
+
+
+def _op_throw(state, frame, opr):
+    v1 = frame.stack.pop()
+    if str(v1) == "java/lang/AssertionError":
+        state.result = "assertion error"
+    else:
+        state.result = str(v1)
+    return state
+
+
+def _op_dup(state, frame, opr):
+    stk = frame.stack
+    if not stk:
+        raise RuntimeError("stack underflow on dup")
+    # jvm.Value is immutable, pushing the same reference twice is fine
+    stk.append(stk[-1])
+    frame.pc.offset += 1
+    return state
+
+
+def _op_store(state, frame, opr):
+    loc = frame.locals
+    while len(loc) <= opr.index:
+        loc.append(None)
+    t = opr.type
+    v = frame.stack.pop()
+    if isinstance(t, jvm.Int) or isinstance(t, jvm.Reference) or isinstance(t, jvm.Double):
+        loc[opr.index] = v
+    elif isinstance(t, sign.SignSet):
+        loc[opr.index] = v
+    else:
+        raise NotImplementedError(f"Unhandled store type: {t}")
+    frame.pc.offset += 1
+    return state
+
+
+def _op_get(state, frame, opr):
+    assert (opr.field.extension.name == "$assertionsDisabled"), f"unknown field {opr.field}"
+    frame.stack.append(jvm.Value.boolean(False))
+    frame.pc.offset += 1
+    return state
+
+
+def _op_ifz(state, frame, opr):
+    cond, target = opr.condition, opr.target
+    v = frame.stack.pop()
+
+    if not isinstance(v, sign.SignSet):
+        v: sign.SignSet = sign.SignSet.abstract_value(v.value)
+
+    take_branch = False
+    if cond == "eq":
+        take_branch = (v.contains("0"))
+    elif cond == "ne":
+        take_branch = (not v.contains("0"))
+    elif cond == "lt":
+        take_branch = (v.contains("-"))
+    elif cond == "gt":
+        take_branch = (v.contains("+"))
+    elif cond == "ge":
+        take_branch = (v.contains("0") or v.contains("+"))
+    elif cond == "le":
+        take_branch = (v.contains("0") or v.contains("-"))
+    else:
+        raise NotImplementedError(f"Unhandled ifz condition: {cond}")
+
+    if take_branch:
+        frame.pc.offset = target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_if(state, frame, opr):
+    stk = frame.stack
+    cond, target = opr.condition, opr.target
+    # Pop right, then left (same order as your concrete interpreter)
+    v2 = stk.pop()
+    v1 = stk.pop()
+
+    # --- Normalise both to SignSet ---
+
+    if not isinstance(v1, sign.SignSet):
+        v1 = sign.SignSet.abstract_value(v1.value)
+
+    if not isinstance(v2, sign.SignSet):
+        v2 = sign.SignSet.abstract_value(v2.value)
+
+    b1, b2 = v1.bits, v2.bits
+
+    if cond == "eq":
+        take_branch = (b1 & b2) != 0
+
+    elif cond == "ne":
+        take_branch = b1 != b2
+
+    elif cond == "lt":
+        take_branch = bool(b1 & sign.NEG and b2 & (sign.ZERO | sign.POS))
+
+    elif cond == "le":
+        take_branch = bool(b1 & (sign.NEG | sign.ZERO))
+
+    elif cond == "ge":
+        take_branch = bool(b1 & (sign.POS | sign.ZERO))
+
+    elif cond == "gt":
+        if b2 == sign.NEG:
+            take_branch = True
+        else:
+            take_branch = bool(b1 & sign.POS and not (b2 & sign.POS))
+    else:
+        raise NotImplementedError(f"Unhandled If condition: {cond}")
+
+    if take_branch:
+        frame.pc.offset = target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_goto(state, frame, opr):
+    t = opr.target
+    assert isinstance(t, int), f"unknown target {t}"
+    frame.pc.offset = t
+    return state
+
+
+def _op_cast(state, frame, opr):
+    stk = frame.stack
+    v1 = stk.pop()
+    i = v1.value
+    frame.pc.offset += 1
+    match opr.to_:
+        case jvm.Short():
+            stk.append(i)
+        case _:
+            raise NotImplementedError(f"Unhandled cast target: {opr.to_}")
+    return state
+
+
+def _op_new_array(state, frame, opr):
+    stk = frame.stack
+    if opr.dim != 1:
+        raise NotImplementedError(f"Don't know how to handle: {opr!r}")
+    size = stk.pop().value
+    if size < 0:
+        state.result = "out of bounds"
+        return state
+    if isinstance(opr.type, jvm.Int):
+        # unboxed int storage instead of a list of PyLongs
+        arr = array("i", bytes(4 * size))
+    else:
+        arr = [0] * size
+    stk.append(arr)
+    frame.pc.offset += 1
+    return state
+
+
+# Built once at import time; step() is a single hash lookup per opcode
+# instead of a linear scan over isinstance checks.
+HANDLERS = {
+    jvm.Push: _op_push,
+    jvm.Load: _op_load,
+    jvm.ArrayLoad: _op_array_load,
+    jvm.ArrayStore: _op_array_store,
+    jvm.ArrayLength: _op_array_length,
+    jvm.Incr: _op_incr,
+    jvm.Binary: _op_binary,
+    jvm.Return: _op_return,
+    jvm.New: _op_new,
+    jvm.InvokeSpecial: _op_invoke_special,
+    jvm.InvokeStatic: _op_invoke_static,
+    jvm.InvokeDynamic: _op_invoke_dynamic,
+    jvm.InvokeVirtual: _op_invoke_virtual,
+    jvm.CompareFloating: _op_compare_floating,
+    jvm.Throw: _op_throw,
+    jvm.Dup: _op_dup,
+    jvm.Store: _op_store,
+    jvm.Get: _op_get,
+    jvm.Ifz: _op_ifz,
+    jvm.If: _op_if,
+    jvm.Goto: _op_goto,
+    jvm.Cast: _op_cast,
+    jvm.NewArray: _op_new_array,
+}
+
+
+# Ifz conditions are static properties of the opcode, so the
+# comparison is picked once at translate time, not per execution.
+def _op_ifz_eq(state, frame, opr):
+    v = frame.stack.pop()
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if v.contains("0"):
+        frame.pc.offset = opr.target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_ifz_ne(state, frame, opr):
+    v = frame.stack.pop()
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if not v.contains("0"):
+        frame.pc.offset = opr.target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_ifz_lt(state, frame, opr):
+    v = frame.stack.pop()
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if v.contains("-"):
+        frame.pc.offset = opr.target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_ifz_gt(state, frame, opr):
+    v = frame.stack.pop()
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if v.contains("+"):
+        frame.pc.offset = opr.target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_ifz_ge(state, frame, opr):
+    v = frame.stack.pop()
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if v.contains("0") or v.contains("+"):
+        frame.pc.offset = opr.target
+    else:
+        frame.pc.offset += 1
+    return state
+
+
+def _op_ifz_le(state, frame, opr):
+    v = frame.stack.pop()
+    if not isinstance(v, sign.SignSet):
+        v = sign.SignSet.abstract_value(v.value)
+    if v.contains("0") or v.contains("-"):
+        frame.pc.offset = opr.target
+    else:
+        frame.pc.offset += 1
+    return state
+
+_IFZ_HANDLERS = {
+    "eq": _op_ifz_eq,
+    "ne": _op_ifz_ne,
+    "lt": _op_ifz_lt,
+    "gt": _op_ifz_gt,
+    "ge": _op_ifz_ge,
+    "le": _op_ifz_le,
+}
+
+
+def _op_unhandled(state, frame, opr):
+    raise NotImplementedError(f"Don't know how to handle: {opr!r}")
+
+
+def _translate(opr):
+    """Pre-decode an opcode into a (handler, opcode) slot (threaded code)."""
+    t = type(opr)
+    if t is jvm.Ifz:
+        handler = _IFZ_HANDLERS.get(opr.condition, _op_ifz)
+    else:
+        handler = HANDLERS.get(t, _op_unhandled)
+    # cache the argument count so Invoke handlers skip the attribute chain
+    if t is jvm.InvokeStatic:
+        object.__setattr__(opr, "_arg_count", len(opr.method.methodid.params._elements))
+    elif t is jvm.InvokeVirtual:
+        m = opr.method
+        object.__setattr__(opr, "_arg_count", len(m.methodid.params._elements) + 1)
+        object.__setattr__(opr, "_is_string_length",
+                           m.classname.dotted() in ("java/lang/String", "java.lang.String")
+                           and m.methodid.name == "length")
+    return (handler, opr)
+
+
+
+def step(state: State) -> State:
+    assert isinstance(state, State), f"expected frame but got {state}"
+    frame = state.frames[-1]
+    handler, opr = bc[frame.pc]
+    return handler(state, frame, opr)
+
+
+def main():
+    # running the driver loop in a function keeps state/step in fast locals
+    frame = Frame.from_method(methodid)
+    bind_args_to_locals(frame, input.values)
+
+    state = State({}, [frame])
+
+    # The sign lattice is finite, so the abstract path either terminates or
+    # revisits an identical state; detecting the revisit is the fixpoint,
+    # which beats burning the whole 1000-step budget on loops.
+    seen: set[str] = set()
+    for x in range(1000):
+        state = step(state)
+        if state.result is not None:
+            print(state.result)
+            break
+        sig = str(state)
+        if sig in seen:
+            print("*")
+            break
+        seen.add(sig)
+        logger.debug(f"STATE: {state}")
+    else:
+        print("*")
+
+
+main()
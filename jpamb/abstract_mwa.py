@@ -1,12 +1,12 @@
 # Machine word abstract domain - Bitfield domain
 # Based on https://en.wikipedia.org/wiki/Abstract_interpretation#Machine_word_abstract_domains
-# 
+#
 # The bitfield domain treats each bit in a machine word separately using 3-valued logic: {0, 1, ⊥}
 # where ⊥ represents "unknown" (could be either 0 or 1).
-# 
+#
 # Concretization function γ:
 #   γ(0) = {0}
-#   γ(1) = {1}  
+#   γ(1) = {1}
 #   γ(⊥) = {0, 1}
 #
 # Abstraction function α:
@@ -16,117 +16,151 @@
 #   α({}) = ⊥
 
 from __future__ import annotations
-from dataclasses import dataclass
+from functools import lru_cache
 from typing import Literal
 
 # Three-valued logic constants
 BitValue = Literal["0", "1", "⊥"]
 
 
-@dataclass(frozen=True)
 class Bitfield:
     """
     Bitfield domain for machine word abstraction.
-    
+
     A machine word of width n is treated as an array of n abstract bit values,
     each from the set {0, 1, ⊥} where:
     - 0: definitely zero
     - 1: definitely one
     - ⊥: unknown (could be 0 or 1)
-    
+
     Supports bitwise operations using Kleene's three-valued logic.
+
+    Internally the word is packed into two integers so every operation is a
+    handful of native bitwise ops instead of a Python loop over the bits:
+    - val: bit i is set iff bit i is definitely one
+    - unk: bit i is set iff bit i is unknown (⊥)
+    A bit that is set in neither is definitely zero; val and unk are disjoint.
+    Bit i counts from the least significant end; the `bits` tuple view is
+    most-significant first, matching the written-out binary word.
+
+    Slotted and immutable by convention (like Interval): instances are
+    allocated per abstract operation, so they carry no per-instance
+    __dict__.
     """
-    bits: tuple[BitValue, ...]
-    bit_width: int = 32
-    
+
+    __slots__ = ('val', 'unk', 'bit_width', '_mask')
+
     def __init__(self, bits: tuple[BitValue, ...] | str = "⊥", bit_width: int = 32):
         """
         Create a bitfield.
-        
+
         Args:
             bits: Either a tuple of bit values or a single value to replicate
             bit_width: Width of the machine word in bits
         """
         if isinstance(bits, str):
-            object.__setattr__(self, 'bits', tuple([bits] * bit_width))
+            bits = bits * bit_width
+        else:
+            bit_width = len(bits)
+            bits = "".join(bits)
+        if bit_width:
+            # parse both masks with C-level string ops instead of a per-bit loop
+            val = int(bits.replace("⊥", "0"), 2)
+            unk = int(bits.replace("1", "0").replace("⊥", "1"), 2)
         else:
-            object.__setattr__(self, 'bits', bits)
-        object.__setattr__(self, 'bit_width', len(self.bits) if isinstance(bits, tuple) else bit_width)
-    
+            val = unk = 0
+        self.val = val
+        self.unk = unk
+        self.bit_width = bit_width
+        self._mask = (1 << bit_width) - 1
+
+    @classmethod
+    def _from_masks(cls, val: int, unk: int, bit_width: int) -> "Bitfield":
+        """Build a bitfield directly from packed masks (internal fast path)."""
+        self = cls.__new__(cls)
+        self.val = val
+        self.unk = unk
+        self.bit_width = bit_width
+        self._mask = (1 << bit_width) - 1
+        return self
+
+    @property
+    def bits(self) -> tuple[BitValue, ...]:
+        """The word as a tuple of abstract bit values, most significant first."""
+        return tuple(self._render())
+
+    def _render(self) -> str:
+        # format() renders both masks at C speed; overlay ⊥ where unk is set
+        v = format(self.val, f"0{self.bit_width}b")
+        u = format(self.unk, f"0{self.bit_width}b")
+        if self.unk == 0:
+            return v
+        return "".join("⊥" if ub == "1" else vb for vb, ub in zip(v, u))
+
     @staticmethod
+    @lru_cache(maxsize=4096)
     def of(value: int, bit_width: int = 32) -> "Bitfield":
         """
         Abstract a concrete integer value to a bitfield.
-        
+
         This implements the abstraction function α for singleton sets:
         α({value}) = bitfield representation of value
+
+        Instances are immutable, so repeated abstractions of the same
+        value share one cached object.
         """
-        bits_list = []
-        for i in range(bit_width):
-            bit_val = (value >> i) & 1
-            bits_list.append("1" if bit_val else "0")
-        return Bitfield(tuple(reversed(bits_list)), bit_width)
-    
+        return Bitfield._from_masks(value & ((1 << bit_width) - 1), 0, bit_width)
+
     @staticmethod
+    @lru_cache(maxsize=None)
     def top(bit_width: int = 32) -> "Bitfield":
         """Create a top element (all bits unknown)"""
-        return Bitfield("⊥", bit_width)
-    
+        return Bitfield._from_masks(0, (1 << bit_width) - 1, bit_width)
+
     def to_int(self) -> int | None:
         """
         Concretize bitfield to integer if all bits are known.
         Returns None if any bit is unknown.
         """
-        if "⊥" in self.bits:
+        if self.unk:
             return None
-        result = 0
-        for bit in self.bits:
-            result = (result << 1) | (1 if bit == "1" else 0)
-        return result
-    
+        return self.val
+
     def join(self, other: "Bitfield") -> "Bitfield":
         """
         Least upper bound (⊔): merge two bitfields.
         Different bits become unknown (⊥).
-        
+
         This computes the smallest bitfield that covers both inputs.
         """
+        if self is other or self == other:
+            # converged fixpoints join a value with itself constantly
+            return self
         if self.bit_width != other.bit_width:
             raise ValueError("Bitfields must have same width")
-        
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            if a == b:
-                result.append(a)
-            else:
-                result.append("⊥")
-        return Bitfield(tuple(result), self.bit_width)
-    
+
+        unk = self.unk | other.unk | (self.val ^ other.val)
+        return Bitfield._from_masks(self.val & other.val & ~unk, unk, self.bit_width)
+
     def meet(self, other: "Bitfield") -> "Bitfield":
         """
         Greatest lower bound (⊓): intersection of two bitfields.
         Returns most precise information from both.
         """
+        if self is other or self == other:
+            return self
         if self.bit_width != other.bit_width:
             raise ValueError("Bitfields must have same width")
-        
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            if a == "⊥":
-                result.append(b)
-            elif b == "⊥":
-                result.append(a)
-            elif a == b:
-                result.append(a)
-            else:
-                # Contradiction: one bit is 0, other is 1
-                raise ValueError("Incompatible bitfields in meet")
-        return Bitfield(tuple(result), self.bit_width)
-    
+
+        # Contradiction: a bit known on both sides but with different values
+        if (self.val ^ other.val) & ~(self.unk | other.unk):
+            raise ValueError("Incompatible bitfields in meet")
+        return Bitfield._from_masks(self.val | other.val, self.unk & other.unk, self.bit_width)
+
     def __and__(self, other: "Bitfield") -> "Bitfield":
         """
         Bitwise AND using three-valued logic.
-        
+
         Truth table (from Wikipedia):
             A ∧ B | 0  ⊥  1
             ------+---------
@@ -136,22 +170,17 @@ class Bitfield:
         """
         if self.bit_width != other.bit_width:
             raise ValueError("Bitfields must have same width")
-        
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            # AND truth table
-            if a == "0" or b == "0":
-                result.append("0")
-            elif a == "1" and b == "1":
-                result.append("1")
-            else:
-                result.append("⊥")
-        return Bitfield(tuple(result), self.bit_width)
-    
+
+        val = self.val & other.val
+        # Unknown unless definitely one on both sides or definitely zero on either
+        zero = (~self.val & ~self.unk) | (~other.val & ~other.unk)
+        unk = ~(val | zero) & self._mask
+        return Bitfield._from_masks(val, unk, self.bit_width)
+
     def __or__(self, other: "Bitfield") -> "Bitfield":
         """
         Bitwise OR using three-valued logic.
-        
+
         Truth table (from Wikipedia):
             A ∨ B | 0  ⊥  1
             ------+---------
@@ -161,41 +190,28 @@ class Bitfield:
         """
         if self.bit_width != other.bit_width:
             raise ValueError("Bitfields must have same width")
-        
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            # OR truth table
-            if a == "1" or b == "1":
-                result.append("1")
-            elif a == "0" and b == "0":
-                result.append("0")
-            else:
-                result.append("⊥")
-        return Bitfield(tuple(result), self.bit_width)
-    
+
+        val = self.val | other.val
+        zero = (~self.val & ~self.unk) & (~other.val & ~other.unk)
+        unk = ~(val | zero) & self._mask
+        return Bitfield._from_masks(val, unk, self.bit_width)
+
     def __xor__(self, other: "Bitfield") -> "Bitfield":
         """
         Bitwise XOR using three-valued logic.
-        
+
         XOR is 1 if bits differ, 0 if same, ⊥ if unknown.
         """
         if self.bit_width != other.bit_width:
             raise ValueError("Bitfields must have same width")
-        
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            if a == "⊥" or b == "⊥":
-                result.append("⊥")
-            elif a != b:
-                result.append("1")
-            else:
-                result.append("0")
-        return Bitfield(tuple(result), self.bit_width)
-    
+
+        unk = self.unk | other.unk
+        return Bitfield._from_masks((self.val ^ other.val) & ~unk, unk, self.bit_width)
+
     def __invert__(self) -> "Bitfield":
         """
         Bitwise NOT using three-valued logic.
-        
+
         Truth table (from Wikipedia):
             NOT(A) | Result
             -------+-------
@@ -203,41 +219,113 @@ class Bitfield:
             ⊥      | ⊥
             1      | 0
         """
-        result = tuple("1" if b == "0" else "0" if b == "1" else "⊥" for b in self.bits)
-        return Bitfield(result, self.bit_width)
-    
+        return Bitfield._from_masks(~self.val & ~self.unk & self._mask, self.unk, self.bit_width)
+
     def lshift(self, n: int) -> "Bitfield":
         """Left shift by n positions, filling with zeros"""
         if n >= self.bit_width:
-            return Bitfield(tuple(["0"] * self.bit_width), self.bit_width)
-        new_bits = self.bits[n:] + tuple(["0"] * n)
-        return Bitfield(new_bits, self.bit_width)
-    
+            return Bitfield._from_masks(0, 0, self.bit_width)
+        mask = self._mask
+        return Bitfield._from_masks((self.val << n) & mask, (self.unk << n) & mask, self.bit_width)
+
     def rshift(self, n: int) -> "Bitfield":
         """Right shift by n positions, filling with zeros (logical shift)"""
         if n >= self.bit_width:
-            return Bitfield(tuple(["0"] * self.bit_width), self.bit_width)
-        new_bits = tuple(["0"] * n) + self.bits[:-n]
-        return Bitfield(new_bits, self.bit_width)
-    
+            return Bitfield._from_masks(0, 0, self.bit_width)
+        return Bitfield._from_masks(self.val >> n, self.unk >> n, self.bit_width)
+
     def is_top(self) -> bool:
         """Check if this is the top element (all bits unknown)"""
-        return all(b == "⊥" for b in self.bits)
-    
+        return self.unk == self._mask
+
     def is_bottom(self) -> bool:
         """
         Bitfield domain has no bottom element.
         Every bitfield pattern is realizable.
         """
         return False
-    
+
     def __repr__(self) -> str:
-        return "".join(self.bits)
-    
+        return self._render()
+
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Bitfield):
             return False
-        return self.bits == other.bits
-    
+        return self.val == other.val and self.unk == other.unk and self.bit_width == other.bit_width
+
     def __hash__(self) -> int:
-        return hash(self.bits)
+        # val and unk are disjoint within bit_width, so concatenating the
+        # masks gives one collision-free integer to hash
+        return hash(self.val | (self.unk << self.bit_width))
+
+class BitfieldStore:
+    """A table of bitfields in structure-of-arrays layout.
+
+    An analyzer holds one abstract word per variable per program point;
+    keeping the whole table as two parallel int64 ndarrays (vals, unks)
+    of shape (n_points, n_vars) lets join, meet and the bitwise ops run
+    as single vectorized numpy expressions over every slot at once,
+    using the same packed-mask formulas as `Bitfield`.
+    """
+
+    def __init__(self, vals, unks, bit_width: int = 32):
+        import numpy as np
+
+        self.vals = np.asarray(vals, dtype=np.int64)
+        self.unks = np.asarray(unks, dtype=np.int64)
+        self.bit_width = bit_width
+
+    @staticmethod
+    def top(n_points: int, n_vars: int, bit_width: int = 32) -> "BitfieldStore":
+        import numpy as np
+
+        mask = (1 << bit_width) - 1
+        shape = (n_points, n_vars)
+        return BitfieldStore(np.zeros(shape, dtype=np.int64),
+                             np.full(shape, mask, dtype=np.int64), bit_width)
+
+    @property
+    def _mask(self) -> int:
+        return (1 << self.bit_width) - 1
+
+    def get(self, point: int, var: int) -> Bitfield:
+        return Bitfield._from_masks(int(self.vals[point, var]),
+                                    int(self.unks[point, var]), self.bit_width)
+
+    def set(self, point: int, var: int, bf: Bitfield) -> None:
+        self.vals[point, var] = bf.val
+        self.unks[point, var] = bf.unk
+
+    def join(self, other: "BitfieldStore") -> "BitfieldStore":
+        unk = self.unks | other.unks | (self.vals ^ other.vals)
+        return BitfieldStore(self.vals & other.vals & ~unk, unk, self.bit_width)
+
+    def meet(self, other: "BitfieldStore") -> "BitfieldStore":
+        # contradictions (a bit known on both sides with different values)
+        # surface as an error, matching Bitfield.meet
+        if ((self.vals ^ other.vals) & ~(self.unks | other.unks)).any():
+            raise ValueError("Incompatible bitfields in meet")
+        return BitfieldStore(self.vals | other.vals, self.unks & other.unks, self.bit_width)
+
+    def __and__(self, other: "BitfieldStore") -> "BitfieldStore":
+        val = self.vals & other.vals
+        zero = (~self.vals & ~self.unks) | (~other.vals & ~other.unks)
+        return BitfieldStore(val, ~(val | zero) & self._mask, self.bit_width)
+
+    def __or__(self, other: "BitfieldStore") -> "BitfieldStore":
+        val = self.vals | other.vals
+        zero = (~self.vals & ~self.unks) & (~other.vals & ~other.unks)
+        return BitfieldStore(val, ~(val | zero) & self._mask, self.bit_width)
+
+    def __xor__(self, other: "BitfieldStore") -> "BitfieldStore":
+        unk = self.unks | other.unks
+        return BitfieldStore((self.vals ^ other.vals) & ~unk, unk, self.bit_width)
+
+    def __invert__(self) -> "BitfieldStore":
+        return BitfieldStore(~self.vals & ~self.unks & self._mask, self.unks, self.bit_width)
+
+    def __repr__(self) -> str:
+        points, vars = self.vals.shape
+        return f"BitfieldStore({points} points x {vars} vars, width {self.bit_width})"
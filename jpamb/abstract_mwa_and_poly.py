@@ -2,237 +2,448 @@
 # Based on interval analysis and bitfield domains from the course material
 
 from __future__ import annotations
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from typing import Optional, Set, Literal, Dict, List, Tuple
 import math
 
+import numpy as np
+
+from jpamb.abstract_mwa import Bitfield
+
 # constants for three-valued logic
 THREE_VALUED_0 = "0"
-THREE_VALUED_1 = "1" 
+THREE_VALUED_1 = "1"
 THREE_VALUED_BOT = "⊥"  # unknown bit value
 
-@dataclass(frozen=True)
+__all__ = [
+    "Interval",
+    "IntervalArray",
+    "SignedInterval",
+    "UnsignedInterval",
+    "Bitfield",
+    "Polyhedra",
+]
+
 class Interval:
-    """Basic interval domain [low, high]"""
-    low: float = -math.inf
-    high: float = math.inf
+    """Basic interval domain [low, high].
+
+    Hand-written with __slots__ rather than a frozen dataclass: the
+    generated __setattr__ guard and per-instance __dict__ cost more than
+    they are worth on a class allocated once per abstract operation.
+    Instances are immutable by convention.
+
+    Bounds are stored as given: finite bounds are normally Python ints
+    (which CPython fast-paths and which keep shift/floordiv exact) and
+    only the unbounded ends use the float infinities. Nothing coerces an
+    int bound to float, so int-only interval chains never box through
+    float arithmetic.
+    """
+
+    __slots__ = ('low', 'high', '_bot', '_top')
+
+    def __init__(self, low: int | float = -math.inf, high: int | float = math.inf):
+        self.low = low
+        self.high = high
+        # cache the bottom/top flags; every arithmetic op checks them,
+        # so a plain attribute load beats re-deriving per call
+        self._bot = low > high
+        self._top = low == -math.inf and high == math.inf
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def of(*values: int):
-        # create interval from concrete values
+        # create interval from concrete values; immutable, so safe to cache
         if not values:
-            return Interval()
+            return _IV_TOP
         return Interval(min(values), max(values))
 
+    @staticmethod
+    def top() -> "Interval":
+        return _IV_TOP
+
+    @staticmethod
+    def bottom() -> "Interval":
+        return _IV_BOTTOM
+
+    def __eq__(self, other) -> bool:
+        if self.__class__ is not other.__class__:
+            return NotImplemented
+        return self.low == other.low and self.high == other.high
+
+    def __hash__(self) -> int:
+        return hash((self.low, self.high))
+
     def is_bottom(self) -> bool:
         # bottom means impossible/empty (low > high)
-        return self.low > self.high
-    
+        return self._bot
+
     def is_top(self) -> bool:
-        return self.low == -math.inf and self.high == math.inf
+        return self._top
 
     def __repr__(self) -> str:
-        if self.is_bottom():
+        if self._bot:
             return "⊥"
-        if self.is_top():
+        if self._top:
             return "(-∞, +∞)"
         return f"[{int(self.low) if self.low != -math.inf else '-∞'}, {int(self.high) if self.high != math.inf else '+∞'}]"
 
     def join(self, other: "Interval") -> "Interval":
         # least upper bound - take widest range
-        if self.is_bottom(): 
+        if self is other or self == other:
+            # converged fixpoints hit this constantly
+            return self
+        if self._bot:
             return other
-        if other.is_bottom(): 
+        if other._bot:
             return self
-        return Interval(min(self.low, other.low), max(self.high, other.high))
+        return _iv_join(self.low, self.high, other.low, other.high)
 
     def meet(self, other: "Interval") -> "Interval":
         # intersection of intervals
-        low = max(self.low, other.low)
-        high = min(self.high, other.high)
-        return Interval(low, high)
+        if self is other or self == other:
+            return self
+        return _iv_meet(self.low, self.high, other.low, other.high)
 
     def widen(self, other: "Interval") -> "Interval":
-        # widening operator for loop termination
-        low = self.low if self.low <= other.low else -math.inf
-        high = self.high if self.high >= other.high else math.inf
+        # widening with thresholds: a moving bound jumps to the next
+        # threshold instead of straight to ±∞, so downstream meets can
+        # still re-tighten and the fixpoint needs fewer iterations
+        if self is other or self == other:
+            return self
+        if self.low <= other.low:
+            low = self.low
+        else:
+            low = _WIDEN_THRESH[bisect_right(_WIDEN_THRESH, other.low) - 1]
+        if self.high >= other.high:
+            high = self.high
+        else:
+            high = _WIDEN_THRESH[bisect_left(_WIDEN_THRESH, other.high)]
+        return Interval(low, high)
+
+    def narrow(self, other: "Interval") -> "Interval":
+        # narrowing: refine bounds that widening threw to ±∞ with the
+        # bounds of the next iterate, leaving finite bounds untouched so
+        # the descending sequence is guaranteed to stop
+        if self is other or self == other:
+            return self
+        low = other.low if self.low == -math.inf else self.low
+        high = other.high if self.high == math.inf else self.high
         return Interval(low, high)
 
     def __add__(self, other: "Interval") -> "Interval":
-        if self.is_bottom() or other.is_bottom():
-            return Interval(1, 0)  # bottom
-        return Interval(self.low + other.low, self.high + other.high)
+        if self._bot or other._bot:
+            return _IV_BOTTOM
+        return _iv_add(self.low, self.high, other.low, other.high)
 
     def __sub__(self, other: "Interval") -> "Interval":
-        if self.is_bottom() or other.is_bottom():
-            return Interval(1, 0)
-        return Interval(self.low - other.high, self.high - other.low)
+        if self._bot or other._bot:
+            return _IV_BOTTOM
+        return _iv_sub(self.low, self.high, other.low, other.high)
 
     def __mul__(self, other: "Interval") -> "Interval":
-        if self.is_bottom() or other.is_bottom():
-            return Interval(1, 0)
-        a, b, c, d = self.low, self.high, other.low, other.high
-        # need to check all combinations
-        return Interval(min(a*c, a*d, b*c, b*d), max(a*c, a*d, b*c, b*d))
+        if self._bot or other._bot:
+            return _IV_BOTTOM
+        return _iv_mul(self.low, self.high, other.low, other.high)
 
     def __neg__(self) -> "Interval":
-        if self.is_bottom():
-            return Interval(1, 0)
+        if self._bot:
+            return _IV_BOTTOM
         return Interval(-self.high, -self.low)
     
+    def _neg_envelope(self, other: "Interval") -> "Interval":
+        # shared fallback for the bitwise ops once a negative operand is
+        # involved: if both operands fit in [-2^k, 2^k), every bit from
+        # position k up is a sign bit, so any bitwise combination stays
+        # in [-2^k, 2^k) as well
+        m = max(abs(self.low), abs(self.high), abs(other.low), abs(other.high))
+        if m == math.inf:
+            return _IV_TOP
+        b = 1 << int(m).bit_length()
+        return Interval(-b, b - 1)
+
     def __and__(self, other: "Interval") -> "Interval":
         # bitwise AND - conservative approximation
-        if self.is_bottom() or other.is_bottom():
-            return Interval(1, 0)
-        
+        if self._bot or other._bot:
+            return _IV_BOTTOM
         if self.low < 0 or other.low < 0:
             # negative numbers make this tricky
-            return Interval(-max(abs(self.high), abs(other.high)), 
-                          max(self.high, other.high))
-        
+            return self._neg_envelope(other)
         return Interval(0, min(self.high, other.high))
-    
+
     def __or__(self, other: "Interval") -> "Interval":
-        if self.is_bottom() or other.is_bottom():
-            return Interval(1, 0)
-        
+        if self._bot or other._bot:
+            return _IV_BOTTOM
         if self.low < 0 or other.low < 0:
-            return Interval(-max(abs(self.high), abs(other.high)), 
-                          max(self.high, other.high))
-        
-        return Interval(0, max(self.high, other.high))
-    
+            return self._neg_envelope(other)
+        return Interval(0, _bit_envelope(self.high, other.high))
+
     def __xor__(self, other: "Interval") -> "Interval":
-        if self.is_bottom() or other.is_bottom():
-            return Interval(1, 0)
-        
+        if self._bot or other._bot:
+            return _IV_BOTTOM
         if self.low < 0 or other.low < 0:
-            return Interval(-max(abs(self.high), abs(other.high)), 
-                          max(self.high, other.high))
-        
-        return Interval(0, max(self.high, other.high))
+            return self._neg_envelope(other)
+        return Interval(0, _bit_envelope(self.high, other.high))
     
     def lshift(self, bits: int) -> "Interval":
-        if self.is_bottom():
-            return Interval(1, 0)
-        return Interval(self.low * (2 ** bits), self.high * (2 ** bits))
-    
+        if self._bot:
+            return _IV_BOTTOM
+        p = _POW2[bits] if bits < len(_POW2) else 1 << bits
+        return Interval(self.low * p, self.high * p)
+
     def rshift(self, bits: int) -> "Interval":
-        if self.is_bottom():
-            return Interval(1, 0)
-        return Interval(self.low // (2 ** bits), self.high // (2 ** bits))
+        if self._bot:
+            return _IV_BOTTOM
+        p = _POW2[bits] if bits < len(_POW2) else 1 << bits
+        return Interval(self.low // p, self.high // p)
+
+
+# interned instances for the values analyses create constantly; the
+# arithmetic bottom paths and the top/bottom constructors hand these
+# out instead of allocating
+_IV_BOTTOM = Interval(1, 0)
+_IV_TOP = Interval()
+_IV_ZERO = Interval.of(0)
+
+
+def _bit_envelope(h1, h2):
+    # smallest 2^k - 1 covering OR/XOR of nonnegative operands; tighter
+    # than max(h1, h2) alone since set bits can combine across operands
+    h = h1 if h1 >= h2 else h2
+    if h == math.inf:
+        return math.inf
+    return (1 << int(h).bit_length()) - 1
+
+
+# Memoized arithmetic cores: fixpoint iteration keeps re-evaluating the
+# same operand pairs, so the dunders delegate to lru_cached helpers
+# keyed on the four raw bounds. The results are immutable Intervals and
+# therefore safe to share between callers.
+
+@lru_cache(maxsize=1 << 16)
+def _iv_add(al, ah, bl, bh) -> Interval:
+    return Interval(al + bl, ah + bh)
+
+
+@lru_cache(maxsize=1 << 16)
+def _iv_sub(al, ah, bl, bh) -> Interval:
+    return Interval(al - bh, ah - bl)
+
+
+def _mul_bound(x, y):
+    # bound product with 0 * inf = 0: the infinite end is only a bound,
+    # so scaling it by an exact zero pins the product to zero instead of
+    # the IEEE nan that would poison every later comparison
+    if x == 0 or y == 0:
+        return 0
+    return x * y
+
+
+@lru_cache(maxsize=1 << 16)
+def _iv_mul(al, ah, bl, bh) -> Interval:
+    # sign-determined cases need only two multiplies; only intervals
+    # straddling zero fall through to the four corner products
+    if al >= 0:
+        if bl >= 0:
+            return Interval(_mul_bound(al, bl), _mul_bound(ah, bh))
+        if bh <= 0:
+            return Interval(_mul_bound(ah, bl), _mul_bound(al, bh))
+    elif ah <= 0:
+        if bl >= 0:
+            return Interval(_mul_bound(al, bh), _mul_bound(ah, bl))
+        if bh <= 0:
+            return Interval(_mul_bound(ah, bh), _mul_bound(al, bl))
+    # compute the four corner products once and reduce with inline
+    # compares instead of paying for them twice via min() and max();
+    # _mul_bound keeps a zero-times-infinite corner at 0 so no nan can
+    # reach the comparisons, which would silently pick the wrong bound
+    ac = _mul_bound(al, bl)
+    ad = _mul_bound(al, bh)
+    bc = _mul_bound(ah, bl)
+    bd = _mul_bound(ah, bh)
+    lo = ac if ac < ad else ad
+    if bc < lo:
+        lo = bc
+    if bd < lo:
+        lo = bd
+    hi = ac if ac > ad else ad
+    if bc > hi:
+        hi = bc
+    if bd > hi:
+        hi = bd
+    return Interval(lo, hi)
+
+
+@lru_cache(maxsize=1 << 16)
+def _iv_join(al, ah, bl, bh) -> Interval:
+    return Interval(min(al, bl), max(ah, bh))
+
+
+@lru_cache(maxsize=1 << 16)
+def _iv_meet(al, ah, bl, bh) -> Interval:
+    return Interval(max(al, bl), min(ah, bh))
+
+# sorted widening thresholds: machine-word boundaries plus the values
+# around zero that loop bounds most often cross
+_WIDEN_THRESH = (
+    -math.inf, -(1 << 63), -(1 << 31), -(1 << 15), -1, 0, 1,
+    1 << 15, 1 << 31, 1 << 63, math.inf,
+)
+
+# powers of two, computed once instead of a Python ** per shift
+_POW2 = [1 << i for i in range(65)]
+
+
+@lru_cache(maxsize=None)
+def _signed_range(bit_width: int) -> tuple[int, int]:
+    # clamp bounds for a signed word, computed once per width
+    return -(1 << (bit_width - 1)), (1 << (bit_width - 1)) - 1
+
+
+@lru_cache(maxsize=None)
+def _unsigned_range(bit_width: int) -> tuple[int, int]:
+    return 0, (1 << bit_width) - 1
+
+
+class IntervalArray:
+    """A batch of intervals in structure-of-arrays layout.
+
+    Holds the lower and upper bounds as two parallel float64 ndarrays so
+    that arithmetic, join and meet over a whole table of intervals run as
+    vectorized numpy expressions instead of one Python call per interval.
+    Bottom is encoded as (+inf, -inf), the same low > high convention as
+    `Interval`, so it propagates through min/max arithmetic without any
+    per-element branching.
+    """
+
+    def __init__(self, lows, highs):
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+
+    @staticmethod
+    def of_intervals(intervals: List[Interval]) -> "IntervalArray":
+        # canonicalize bottom to (+inf, -inf) so it survives arithmetic
+        lows = [math.inf if iv.is_bottom() else iv.low for iv in intervals]
+        highs = [-math.inf if iv.is_bottom() else iv.high for iv in intervals]
+        return IntervalArray(lows, highs)
+
+    @staticmethod
+    def top(n: int) -> "IntervalArray":
+        return IntervalArray(np.full(n, -np.inf), np.full(n, np.inf))
+
+    @staticmethod
+    def bottom(n: int) -> "IntervalArray":
+        return IntervalArray(np.full(n, np.inf), np.full(n, -np.inf))
+
+    def __len__(self) -> int:
+        return len(self.lows)
+
+    def __getitem__(self, i: int) -> Interval:
+        return Interval(float(self.lows[i]), float(self.highs[i]))
+
+    def is_bottom(self) -> np.ndarray:
+        # elementwise bottom mask
+        return self.lows > self.highs
+
+    def add_batch(self, other: "IntervalArray") -> "IntervalArray":
+        # a bottom row against an unbounded one hits inf + -inf = nan,
+        # so mask bottom rows back to (+inf, -inf) like mul_batch does
+        with np.errstate(invalid="ignore"):
+            lows = self.lows + other.lows
+            highs = self.highs + other.highs
+        bot = self.is_bottom() | other.is_bottom()
+        return IntervalArray(np.where(bot, np.inf, lows), np.where(bot, -np.inf, highs))
+
+    def sub_batch(self, other: "IntervalArray") -> "IntervalArray":
+        with np.errstate(invalid="ignore"):
+            lows = self.lows - other.highs
+            highs = self.highs - other.lows
+        bot = self.is_bottom() | other.is_bottom()
+        return IntervalArray(np.where(bot, np.inf, lows), np.where(bot, -np.inf, highs))
+
+    def mul_batch(self, other: "IntervalArray") -> "IntervalArray":
+        # all four corner products, reduced along the stacked axis;
+        # bottom rows produce inf * 0 = nan, masked out below
+        with np.errstate(invalid="ignore"):
+            products = np.stack([
+                self.lows * other.lows,
+                self.lows * other.highs,
+                self.highs * other.lows,
+                self.highs * other.highs,
+            ])
+        # nan only arises from 0 * inf; as in _mul_bound, an exact zero
+        # factor pins the product to zero, so the nan corners become 0
+        # instead of poisoning the min/max reduction
+        products = np.where(np.isnan(products), 0.0, products)
+        lows = np.minimum.reduce(products)
+        highs = np.maximum.reduce(products)
+        # bottom on either side stays bottom
+        bot = self.is_bottom() | other.is_bottom()
+        return IntervalArray(np.where(bot, np.inf, lows), np.where(bot, -np.inf, highs))
+
+    def join_batch(self, other: "IntervalArray") -> "IntervalArray":
+        return IntervalArray(np.minimum(self.lows, other.lows),
+                             np.maximum(self.highs, other.highs))
+
+    def meet_batch(self, other: "IntervalArray") -> "IntervalArray":
+        return IntervalArray(np.maximum(self.lows, other.lows),
+                             np.minimum(self.highs, other.highs))
+
+    def __repr__(self) -> str:
+        return f"IntervalArray({len(self)} intervals)"
 
 
-@dataclass(frozen=True, order=True)
 class SignedInterval(Interval):
     """Signed interval with bit width (default 32-bit)"""
-    bit_width: int = 32
-    
-    def __post_init__(self):
-        min_val = -(2 ** (self.bit_width - 1))
-        max_val = 2 ** (self.bit_width - 1) - 1
-        
+
+    __slots__ = ('bit_width',)
+
+    def __init__(self, low: float = -math.inf, high: float = math.inf, bit_width: int = 32):
+        min_val, max_val = _signed_range(bit_width)
+
         # clamp to valid range
-        if not (self.low == -math.inf or self.low == math.inf):
-            object.__setattr__(self, 'low', max(self.low, min_val))
-        if not (self.high == -math.inf or self.high == math.inf):
-            object.__setattr__(self, 'high', min(self.high, max_val))
+        if not (low == -math.inf or low == math.inf):
+            low = max(low, min_val)
+        if not (high == -math.inf or high == math.inf):
+            high = min(high, max_val)
+        super().__init__(low, high)
+        self.bit_width = bit_width
+
+    def __eq__(self, other) -> bool:
+        eq = super().__eq__(other)
+        if eq is NotImplemented or not eq:
+            return eq
+        return self.bit_width == other.bit_width
+
+    def __hash__(self) -> int:
+        return hash((self.low, self.high, self.bit_width))
 
 
-@dataclass(frozen=True, order=True)
 class UnsignedInterval(Interval):
     """Unsigned interval [0, 2^n - 1]"""
-    bit_width: int = 32
-    
-    def __post_init__(self):
-        min_val = 0
-        max_val = 2 ** self.bit_width - 1
-        
-        if not (self.low == -math.inf or self.low == math.inf):
-            object.__setattr__(self, 'low', max(self.low, min_val))
-        if not (self.high == -math.inf or self.high == math.inf):
-            object.__setattr__(self, 'high', min(self.high, max_val))
-
-
-@dataclass(frozen=True)
-class Bitfield:
-    """Bitfield with 3-valued logic: 0, 1, or ⊥ (unknown)"""
-    bits: tuple = ()
-    bit_width: int = 32
-    
-    def __init__(self, bits: tuple | str = "⊥", bit_width: int = 32):
-        if isinstance(bits, str):
-            object.__setattr__(self, 'bits', tuple([bits] * bit_width))
-        else:
-            object.__setattr__(self, 'bits', bits)
-        object.__setattr__(self, 'bit_width', bit_width)
-    
-    @staticmethod
-    def of(value: int, bit_width: int = 32) -> "Bitfield":
-        # convert concrete value to bitfield
-        bits_list = []
-        for i in range(bit_width):
-            bit_val = (value >> i) & 1
-            bits_list.append("1" if bit_val else "0")
-        return Bitfield(tuple(reversed(bits_list)), bit_width)
-    
-    def _bit_op_3valued(self, op: str, other: "Bitfield") -> "Bitfield":
-        # 3-valued logic operations
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            if op == "AND":
-                table = {
-                    ("0", "0"): "0", ("0", "1"): "0", ("0", "⊥"): "0",
-                    ("1", "0"): "0", ("1", "1"): "1", ("1", "⊥"): "⊥",
-                    ("⊥", "0"): "0", ("⊥", "1"): "⊥", ("⊥", "⊥"): "⊥",
-                }
-            elif op == "OR":
-                table = {
-                    ("0", "0"): "0", ("0", "1"): "1", ("0", "⊥"): "⊥",
-                    ("1", "0"): "1", ("1", "1"): "1", ("1", "⊥"): "1",
-                    ("⊥", "0"): "⊥", ("⊥", "1"): "1", ("⊥", "⊥"): "⊥",
-                }
-            elif op == "XOR":
-                table = {
-                    ("0", "0"): "0", ("0", "1"): "1", ("0", "⊥"): "⊥",
-                    ("1", "0"): "1", ("1", "1"): "0", ("1", "⊥"): "⊥",
-                    ("⊥", "0"): "⊥", ("⊥", "1"): "⊥", ("⊥", "⊥"): "⊥",
-                }
-            result.append(table.get((a, b), "⊥"))
-        return Bitfield(tuple(result), self.bit_width)
-    
-    def __and__(self, other: "Bitfield") -> "Bitfield":
-        return self._bit_op_3valued("AND", other)
-    
-    def __or__(self, other: "Bitfield") -> "Bitfield":
-        return self._bit_op_3valued("OR", other)
-    
-    def __xor__(self, other: "Bitfield") -> "Bitfield":
-        return self._bit_op_3valued("XOR", other)
-    
-    def __invert__(self) -> "Bitfield":
-        # flip bits (0->1, 1->0, ⊥ stays ⊥)
-        result = tuple("1" if b == "0" else "0" if b == "1" else "⊥" for b in self.bits)
-        return Bitfield(result, self.bit_width)
-    
-    def join(self, other: "Bitfield") -> "Bitfield":
-        # merge bitfields - different bits become unknown
-        result = []
-        for a, b in zip(self.bits, other.bits):
-            if a == b:
-                result.append(a)
-            else:
-                result.append("⊥")
-        return Bitfield(tuple(result), self.bit_width)
-    
-    def is_bottom(self) -> bool:
-        return False
-    
-    def __repr__(self) -> str:
-        return "".join(self.bits)
+
+    __slots__ = ('bit_width',)
+
+    def __init__(self, low: float = -math.inf, high: float = math.inf, bit_width: int = 32):
+        max_val = _unsigned_range(bit_width)[1]
+
+        if not (low == -math.inf or low == math.inf):
+            low = max(low, 0)
+        if not (high == -math.inf or high == math.inf):
+            high = min(high, max_val)
+        super().__init__(low, high)
+        self.bit_width = bit_width
+
+    def __eq__(self, other) -> bool:
+        eq = super().__eq__(other)
+        if eq is NotImplemented or not eq:
+            return eq
+        return self.bit_width == other.bit_width
+
+    def __hash__(self) -> int:
+        return hash((self.low, self.high, self.bit_width))
 
 
-@dataclass
 class Polyhedra:
     """A lightweight (conservative) polyhedra abstraction.
 
@@ -248,16 +459,59 @@ class Polyhedra:
       (i.e., an over-approximating box) to keep implementation simple.
     """
 
-    constraints: List[Tuple[Dict[str, float], float]] = None
-    vars: Set[str] = None
-    _is_bottom: bool = False
+    __slots__ = ('constraints', 'vars', '_is_bottom', '_var_index',
+                 '_var_names', '_sv_var', '_sv_coef', '_sv_rhs',
+                 '_infeasible_row', '_bounds_cache')
 
     def __init__(self, constraints: List[Tuple[Dict[str, float], float]] | None = None):
-        self.constraints = list(constraints) if constraints else []
+        self.constraints = []
         self.vars = set()
-        for coeffs, _ in self.constraints:
-            self.vars.update(coeffs.keys())
         self._is_bottom = False
+        # structure-of-arrays mirror of the single-variable constraints:
+        # variable names are interned to dense ids so _compute_bounds can
+        # run as a vectorized numpy pass instead of unpacking one dict
+        # per row (single-var rows are the common case by far)
+        self._var_index: Dict[str, int] = {}
+        self._var_names: List[str] = []
+        self._sv_var: List[int] = []
+        self._sv_coef: List[float] = []
+        self._sv_rhs: List[float] = []
+        self._infeasible_row = False
+        self._bounds_cache: Dict[str, Tuple[float | None, float | None]] | None = None
+        if constraints:
+            for coeffs, rhs in constraints:
+                self._append(coeffs, rhs)
+
+    def _var_id(self, v: str) -> int:
+        i = self._var_index.get(v)
+        if i is None:
+            i = self._var_index[v] = len(self._var_names)
+            self._var_names.append(v)
+        return i
+
+    def _append(self, coeffs: Dict[str, float], rhs: float) -> None:
+        # store the row and keep the SoA mirror in sync
+        self._bounds_cache = None
+        self.constraints.append((coeffs, rhs))
+        self.vars.update(coeffs.keys())
+        if not coeffs:
+            if rhs < 0:
+                self._infeasible_row = True
+            return
+        for v in coeffs:
+            self._var_id(v)
+        if len(coeffs) == 1:
+            (v, a), = coeffs.items()
+            self._sv_var.append(self._var_index[v])
+            self._sv_coef.append(a)
+            self._sv_rhs.append(rhs)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Polyhedra):
+            return NotImplemented
+        return (self.constraints == other.constraints
+                and self.vars == other.vars
+                and self._is_bottom == other._is_bottom)
 
     @staticmethod
     def top() -> "Polyhedra":
@@ -283,8 +537,7 @@ class Polyhedra:
             return
 
         # store constraint and update var set
-        self.constraints.append((dict(coeffs), float(rhs)))
-        self.vars.update(coeffs.keys())
+        self._append(dict(coeffs), float(rhs))
 
         # quick single-variable contradiction check
         if len(coeffs) == 1:
@@ -317,6 +570,8 @@ class Polyhedra:
         intervals and returning the box (interval constraints) that covers both.
         This is a conservative but cheap approximation of convex hull.
         """
+        if self is other or self == other:
+            return self
         if self.is_bottom():
             return other
         if other.is_bottom():
@@ -359,38 +614,125 @@ class Polyhedra:
 
         return box
 
+    def frozen(self) -> tuple:
+        """A hashable structural snapshot of this polyhedron.
+
+        Polyhedra itself stays mutable (add_constraint builds it up in
+        place), so it cannot key an lru_cache directly; callers that
+        want to memoize meet/join results across fixpoint iterations can
+        key on this tuple instead. Coefficients are sorted by variable so
+        equal polyhedra built in different orders snapshot identically.
+        """
+        if self._is_bottom:
+            return (False,)
+        return tuple(sorted(
+            (tuple(sorted(coeffs.items())), rhs)
+            for coeffs, rhs in self.constraints
+        ))
+
+    def widen(self, other: "Polyhedra") -> "Polyhedra":
+        """Box widening against a newer iterate `other`.
+
+        Per variable, a bound of `self` that is still stable in `other`
+        is kept; a bound that moved is dropped to unbounded, so loop
+        fixpoints converge in a bounded number of steps instead of
+        crawling one constraint tightening at a time. Like `join`, the
+        result is a box of single-variable constraints.
+        """
+        if self is other or self == other:
+            # widen x x == x, or the fixpoint never stabilizes
+            return self
+        if self.is_bottom():
+            return other
+        if other.is_bottom():
+            return self
+
+        bounds_s = self._compute_bounds()
+        bounds_o = other._compute_bounds()
+        box = Polyhedra()
+        for v in set(bounds_s) | set(bounds_o):
+            lo_s, hi_s = bounds_s.get(v, (None, None))
+            lo_o, hi_o = bounds_o.get(v, (None, None))
+            if lo_s is not None and lo_o is not None and lo_s <= lo_o:
+                box.add_constraint({v: -1.0}, -float(lo_s))
+            if hi_s is not None and hi_o is not None and hi_s >= hi_o:
+                box.add_constraint({v: 1.0}, float(hi_s))
+        return box
+
+    def narrow(self, other: "Polyhedra") -> "Polyhedra":
+        """Box narrowing: refill bounds that widening dropped.
+
+        Per variable, an unbounded end of `self` takes the bound of the
+        post-widening iterate `other`; bounds `self` already has are
+        kept. Run for a bounded number of sweeps after widening has
+        converged to claw back precision.
+        """
+        if self is other or self == other:
+            return self
+        if self.is_bottom() or other.is_bottom():
+            return Polyhedra.bottom()
+
+        bounds_s = self._compute_bounds()
+        bounds_o = other._compute_bounds()
+        box = Polyhedra()
+        for v in set(bounds_s) | set(bounds_o):
+            lo_s, hi_s = bounds_s.get(v, (None, None))
+            lo_o, hi_o = bounds_o.get(v, (None, None))
+            lo = lo_o if lo_s is None else lo_s
+            hi = hi_o if hi_s is None else hi_s
+            if lo is not None:
+                box.add_constraint({v: -1.0}, -float(lo))
+            if hi is not None:
+                box.add_constraint({v: 1.0}, float(hi))
+        return box
+
     def _compute_bounds(self) -> Dict[str, Tuple[float | None, float | None]]:
         """Compute simple per-variable bounds from single-var constraints.
 
         Returns mapping var -> (low, high) where None indicates unknown.
         Only constraints of the form a*v <= b (single variable) are used.
+
+        The result is cached until the next added constraint; meet and
+        join call this repeatedly on unchanged polyhedra during fixpoint
+        iteration, so treat the returned dict as read-only.
         """
+        if self._bounds_cache is not None:
+            return self._bounds_cache
+        if self._infeasible_row:
+            # some row was 0 <= rhs with rhs < 0
+            bounds = {v: (1.0, 0.0) for v in self.vars}
+            self._bounds_cache = bounds
+            return bounds
+        if not self._sv_var:
+            self._bounds_cache = {}
+            return self._bounds_cache
+
+        # Only single-variable constraints feed this projection; multi-var
+        # constraints are ignored (they could tighten bounds but projecting
+        # them precisely requires more machinery). The rows live in the SoA
+        # mirror, so the reduction per variable is a pair of scatter ops
+        # over contiguous arrays rather than a dict unpack per row.
+        var = np.fromiter(self._sv_var, dtype=np.int64)
+        coef = np.fromiter(self._sv_coef, dtype=np.float64)
+        rhs = np.fromiter(self._sv_rhs, dtype=np.float64)
+
+        n = len(self._var_names)
+        lo = np.full(n, -np.inf)
+        hi = np.full(n, np.inf)
+        pos = coef > 0
+        neg = coef < 0
+        # a * v <= rhs: a > 0 => v <= rhs/a, a < 0 => v >= rhs/a
+        np.minimum.at(hi, var[pos], rhs[pos] / coef[pos])
+        np.maximum.at(lo, var[neg], rhs[neg] / coef[neg])
+
+        seen = np.zeros(n, dtype=bool)
+        seen[var] = True
         bounds: Dict[str, Tuple[float | None, float | None]] = {}
-        # Only use single-variable constraints to compute simple lower/upper
-        # bounds. Multi-var constraints are ignored in this projection (they
-        # could tighten bounds but projecting them precisely requires more
-        # machinery).
-        for coeffs, rhs in self.constraints:
-            if not coeffs:
-                # constraint is 0 <= rhs; infeasible if rhs < 0
-                if rhs < 0:
-                    return {v: (1.0, 0.0) for v in self.vars}  # mark infeasible
-                continue
-
-            if len(coeffs) == 1:
-                (v, a), = coeffs.items()
-                lo, hi = bounds.get(v, (None, None))
-                # a * v <= rhs
-                # if a > 0  => v <= rhs / a
-                # if a < 0  => v >= rhs / a
-                if a > 0:
-                    ub = rhs / a
-                    hi = ub if hi is None else min(hi, ub)
-                elif a < 0:
-                    lb = rhs / a
-                    lo = lb if lo is None else max(lo, lb)
-                bounds[v] = (lo, hi)
-
+        for i in np.nonzero(seen)[0]:
+            l, h = lo[i], hi[i]
+            bounds[self._var_names[i]] = (None if l == -np.inf else float(l),
+                                          None if h == np.inf else float(h))
+        self._bounds_cache = bounds
         return bounds
 
     def assume_equal(self, var: str, value: float) -> None:
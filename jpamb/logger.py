@@ -36,22 +36,23 @@ def initialize(verbose: int):
 
 
 def summary64(cmd):
-    import base64
-    import hashlib
+    # cosmetic process tag for log lines; a CRC is plenty and skips the
+    # SHA-256 + base64 round trip per spawned command
+    import zlib
 
-    return base64.b64encode(hashlib.sha256(str(cmd).encode()).digest()).decode()[:8]
+    return f"{zlib.crc32(str(cmd).encode()):08x}"
 
 
 def run_cmd(cmd: list[str], /, timeout, logger, **kwargs):
+    import os
+    import selectors
     import shlex
-    import threading
     from time import monotonic, perf_counter_ns
 
     logger = logger.bind(process=summary64(cmd))
     cp = None
     stdout = []
     stderr = []
-    tout = None
     try:
         start = monotonic()
         start_ns = perf_counter_ns()
@@ -64,29 +65,40 @@ def run_cmd(cmd: list[str], /, timeout, logger, **kwargs):
         logger.debug(f"starting: {shlex.join(map(str, cmd))}")
 
         cp = subprocess.Popen(
-            cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE, text=True, **kwargs
+            cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE, **kwargs
         )
         assert cp and cp.stdout and cp.stderr
 
-        def log_lines(cp):
-            assert cp.stderr
-            with cp.stderr:
-                for line in iter(cp.stderr.readline, ""):
-                    stderr.append(line)
-                    logger.debug(line[:-1])
-
-        def save_result(cp):
-            assert cp.stdout
-            with cp.stdout:
-                stdout.append(cp.stdout.read())
-
-        terr = threading.Thread(target=log_lines, args=(cp,), daemon=True)
-        terr.start()
-        tout = threading.Thread(target=save_result, args=(cp,), daemon=True)
-        tout.start()
-
-        terr.join(end and end - monotonic())
-        tout.join(end and end - monotonic())
+        # Drain both pipes from one selector loop, one os.read per
+        # chunk instead of one Python readline call per output line
+        # (and no reader threads to schedule around the GIL).
+        buffers = {cp.stdout.fileno(): bytearray(), cp.stderr.fileno(): bytearray()}
+        sel = selectors.DefaultSelector()
+        sel.register(cp.stdout, selectors.EVENT_READ)
+        sel.register(cp.stderr, selectors.EVENT_READ)
+        while sel.get_map():
+            if end is not None:
+                wait = end - monotonic()
+                if wait <= 0:
+                    break
+            else:
+                wait = None
+            for key, _ in sel.select(wait):
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    buffers[key.fd] += chunk
+                else:
+                    sel.unregister(key.fileobj)
+        sel.close()
+
+        stdout.append(buffers[cp.stdout.fileno()].decode())
+        # split stderr into lines only now, and only log them when the
+        # sink would actually show DEBUG
+        stderr.extend(buffers[cp.stderr.fileno()].decode().splitlines(keepends=True))
+        if logger._core.min_level <= 10:  # DEBUG
+            for line in stderr:
+                logger.debug(line[:-1] if line.endswith("\n") else line)
+
         exitcode = cp.wait(end and end - monotonic())
         end_ns = perf_counter_ns()
 
@@ -101,8 +113,6 @@ def run_cmd(cmd: list[str], /, timeout, logger, **kwargs):
         logger.debug("done")
         return (stdout[0].strip(), end_ns - start_ns)
     except subprocess.CalledProcessError as e:
-        if tout:
-            tout.join()
         e.stdout = stdout[0].strip()
         raise e
     except subprocess.TimeoutExpired:
@@ -242,6 +242,7 @@ class Suite:
     def invalidate_cache(self):
         """Invalidate the case, and require a recomputation of the cached values."""
         self._cases = None
+        self._case_methods = None
 
     @property
     def stats_folder(self) -> Path:
@@ -337,12 +338,17 @@ class Suite:
         return self._cases
 
     def case_methods(self) -> Iterable[tuple[jvm.Absolute[jvm.MethodID], set[str]]]:
-        methods = defaultdict(set)
+        # built once per cache generation; several commands iterate this
+        # repeatedly and the grouping only depends on the case file
+        if self._case_methods is None:
+            methods = defaultdict(set)
 
-        for case in self.cases:
-            methods[case.methodid].add(case.result)
+            for case in self.cases:
+                methods[case.methodid].add(case.result)
 
-        return methods.items()
+            self._case_methods = tuple(methods.items())
+
+        return self._case_methods
 
     def case_opcodes(self) -> list[jvm.Opcode]:
         for m, _ in self.case_methods():
@@ -1,156 +1,235 @@
-from dataclasses import dataclass
-from typing import TypeAlias, Literal
-
-from dataclasses import dataclass
 from typing import TypeAlias, Literal
 from jpamb import jvm
 
 # Define Sign as a type alias for the allowed literals
 Sign: TypeAlias = Literal["+", "-", "0"]
 
-@dataclass
+# One bit per sign so that membership, join, meet and (dis)equality are
+# single integer operations instead of Python set operations.
+NEG = 1
+ZERO = 2
+POS = 4
+TOP_BITS = NEG | ZERO | POS
+
+_SIGN_BIT = {"-": NEG, "0": ZERO, "+": POS}
+_BIT_SIGN = {NEG: "-", ZERO: "0", POS: "+"}
+
+
 class SignSet:
-    signs: set[Sign]
+    __slots__ = ('bits',)
+
+    def __init__(self, signs=0):
+        if isinstance(signs, int):
+            self.bits = signs
+        else:
+            bits = 0
+            for s in signs:
+                bits |= _SIGN_BIT[s]
+            self.bits = bits
+
+    def __eq__(self, other):
+        return isinstance(other, SignSet) and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return f"SignSet(signs={self.signs})"
+
+    @property
+    def signs(self) -> set[Sign]:
+        return {s for s, b in _SIGN_BIT.items() if self.bits & b}
+
+    # the constructors below return the shared instances from _SETS, so
+    # hot paths that keep asking for top/bottom/one-sign sets never
+    # allocate
 
     @classmethod
     def bottom(cls) -> "SignSet":
-        return cls(set())
+        return _SETS[0]
 
     @classmethod
     def top(cls) -> "SignSet":
-        return cls({"+", "-", "0"})
+        return _SETS[TOP_BITS]
 
     @classmethod
     def pos(cls) -> "SignSet":
-        return cls({"+",})
+        return _SETS[POS]
 
     @classmethod
     def neg(cls) -> "SignSet":
-        return cls({"-",})
+        return _SETS[NEG]
 
     @classmethod
     def zero(cls) -> "SignSet":
-        return cls({"0",})
+        return _SETS[ZERO]
 
     def is_bottom(self) -> bool:
-        return len(self.signs) == 0
+        return self.bits == 0
 
     def is_top(self) -> bool:
-        return self.signs == {"+", "-", "0"}
+        return self.bits == TOP_BITS
 
     def join(self, other: "SignSet") -> "SignSet":
-        return SignSet(self.signs | other.signs)
+        # widen x x == x must hold exactly or the worklist never drains
+        if self is other or self.bits == other.bits:
+            return self
+        return _SETS[self.bits | other.bits]
+
+    def widen(self, other: "SignSet") -> "SignSet":
+        # the sign lattice is finite, so widening is just the join; kept
+        # as a named hook so merges on loop back edges can stay domain
+        # agnostic
+        return self.join(other)
 
     def meet(self, other: "SignSet") -> "SignSet":
-        return SignSet(self.signs & other.signs)
+        return _SETS[self.bits & other.bits]
 
-    def contains(self, sign: str) -> bool:
-        return sign in self.signs
+    def narrow(self, other: "SignSet") -> "SignSet":
+        # dual of widen, matching the Interval API; a decreasing
+        # iteration keeps whatever the re-evaluation still justifies
+        return self.meet(other)
 
     def contains(self, sign: str) -> bool:
-        return sign in self.signs
+        return bool(self.bits & _SIGN_BIT[sign])
 
     @classmethod
     def from_int(cls, n: int) -> "SignSet":
         if n < 0:
-            return cls(frozenset({'-'}))
+            return _SETS[NEG]
         if n == 0:
-            return cls(frozenset({'0'}))
-        return cls(frozenset({'+'}))
+            return _SETS[ZERO]
+        return _SETS[POS]
 
     @classmethod
     def from_float(cls, x: float) -> "SignSet":
         if x < 0.0:
-            return cls(frozenset({'-'}))
+            return _SETS[NEG]
         if x == 0.0:
-            return cls(frozenset({'0'}))
-        return cls(frozenset({'+'}))
+            return _SETS[ZERO]
+        return _SETS[POS]
 
     @classmethod
     def abstract_value(cls, v) -> "SignSet":
+        # exact-type dispatch: one dict lookup instead of an isinstance
+        # chain, and bool stays distinct from int without an ordering
+        # constraint between the checks
+        f = _ABSTRACT_DISPATCH.get(type(v))
+        if f is not None:
+            return f(v)
         if isinstance(v, SignSet):
             return v
-
-        if isinstance(v, bool):
-            if not v:
-                return cls(frozenset({'0'}))
-            else:
-                return cls(frozenset({'+', '-'}))
-
-        if isinstance(v, int):
-            return cls.from_int(v)
-
-        if isinstance(v, float):
-            return cls.from_float(v)
-
         return cls.bottom()
-    
+
     def add(self, other: "SignSet") -> "SignSet":
-        result_signs = set()
-        if self.contains("+") and other.contains("+"):
-            result_signs.add("+")
-        if "-" in self.signs and "-" in other.signs:
-            result_signs.add("-")
-        if ("+" in self.signs and "-" in other.signs) or ("-" in self.signs and "+" in other.signs):
-            result_signs.add("0")
-        if "0" in self.signs:
-            result_signs.update(other.signs)
-        if "0" in other.signs:
-            result_signs.update(self.signs)
-        return SignSet(result_signs)
-    
+        return ADD_TBL[self.bits][other.bits]
+
     def sub(self, other: "SignSet") -> "SignSet":
-        result_signs = set()
-        if "+" in self.signs and "-" in other.signs:
-            result_signs.add("+")
-        if "-" in self.signs and "+" in other.signs:
-            result_signs.add("-")
-        if ("+" in self.signs and "+" in other.signs) or ("-" in self.signs and "-" in other.signs):
-            result_signs.add("0")
-        if "0" in self.signs:
-            for s in other.signs:
-                if s == "+":
-                    result_signs.add("-")
-                elif s == "-":
-                    result_signs.add("+")
-                else:
-                    result_signs.add("0")
-        if "0" in other.signs:
-            result_signs.update(self.signs)
-        return SignSet(result_signs)
-    
+        return SUB_TBL[self.bits][other.bits]
+
     def mult(self, other: "SignSet") -> "SignSet":
-        result_signs = set()
-        for s1 in self.signs:
-            for s2 in other.signs:
-                if s1 == "0" or s2 == "0":
-                    result_signs.add("0")
-                elif s1 == s2:
-                    result_signs.add("+")
-                else:
-                    result_signs.add("-")
-        return SignSet(result_signs)
-    
+        return MUL_TBL[self.bits][other.bits]
+
     def div(self, other: "SignSet") -> "SignSet":
-        result_signs = set()
-        for s1 in self.signs:
-            for s2 in other.signs:
-                if s2 == "0":
-                    continue
-                if s1 == "0":
-                    result_signs.add("0")
-                elif s1 == s2:
-                    result_signs.add("+")
-                else:
-                    result_signs.add("-")
-        return SignSet(result_signs)
-    
+        return DIV_TBL[self.bits][other.bits]
+
     def rem(self, other: "SignSet") -> "SignSet":
-        result_signs = set()
-        if "+" in self.signs:
-            result_signs.add("+")
-            result_signs.add("0")
-        if "-" in self.signs:
-            result_signs.add("-")
-            result_signs.add("0")
-        return SignSet(result_signs)
\ No newline at end of file
+        return REM_TBL[self.bits][other.bits]
+
+
+# The transfer functions below define the operators pointwise on the bit
+# masks; there are only 8 possible sets, so at import time each operator
+# is compiled into an 8x8 table of shared SignSet instances and the
+# methods above become a double index with no computation.
+
+def _add_bits(a: int, b: int) -> int:
+    res = 0
+    if a & POS and b & POS:
+        res |= POS
+    if a & NEG and b & NEG:
+        res |= NEG
+    if (a & POS and b & NEG) or (a & NEG and b & POS):
+        res |= ZERO
+    if a & ZERO:
+        res |= b
+    if b & ZERO:
+        res |= a
+    return res
+
+
+def _sub_bits(a: int, b: int) -> int:
+    res = 0
+    if a & POS and b & NEG:
+        res |= POS
+    if a & NEG and b & POS:
+        res |= NEG
+    if (a & POS and b & POS) or (a & NEG and b & NEG):
+        res |= ZERO
+    if a & ZERO:
+        # 0 - x flips the sign bits of x
+        if b & POS:
+            res |= NEG
+        if b & NEG:
+            res |= POS
+        if b & ZERO:
+            res |= ZERO
+    if b & ZERO:
+        res |= a
+    return res
+
+
+def _mult_bits(a: int, b: int) -> int:
+    res = 0
+    if (a & ZERO and b) or (b & ZERO and a):
+        res |= ZERO
+    if (a & POS and b & POS) or (a & NEG and b & NEG):
+        res |= POS
+    if (a & POS and b & NEG) or (a & NEG and b & POS):
+        res |= NEG
+    return res
+
+
+def _div_bits(a: int, b: int) -> int:
+    res = 0
+    if a & ZERO and b & ~ZERO:
+        res |= ZERO
+    if (a & POS and b & POS) or (a & NEG and b & NEG):
+        res |= POS
+    if (a & POS and b & NEG) or (a & NEG and b & POS):
+        res |= NEG
+    return res
+
+
+def _rem_bits(a: int, b: int) -> int:
+    res = 0
+    if a & POS:
+        res |= POS | ZERO
+    if a & NEG:
+        res |= NEG | ZERO
+    return res
+
+
+_SETS = [SignSet(m) for m in range(TOP_BITS + 1)]
+
+
+def _table(op) -> list[list[SignSet]]:
+    return [[_SETS[op(a, b)] for b in range(8)] for a in range(8)]
+
+
+def _abstract_bool(v: bool) -> SignSet:
+    return _SETS[ZERO] if not v else _SETS[NEG | POS]
+
+
+_ABSTRACT_DISPATCH = {
+    bool: _abstract_bool,
+    int: SignSet.from_int,
+    float: SignSet.from_float,
+    SignSet: lambda v: v,
+}
+
+
+ADD_TBL = _table(_add_bits)
+SUB_TBL = _table(_sub_bits)
+MUL_TBL = _table(_mult_bits)
+DIV_TBL = _table(_div_bits)
+REM_TBL = _table(_rem_bits)
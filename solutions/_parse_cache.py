@@ -0,0 +1,63 @@
+"""A small persistent source cache for the syntactic analyses.
+
+tree-sitter trees cannot be serialized, so the cache stores the source
+bytes keyed by path and content hash (plus the file mtime for cheap
+freshness checks) in a sqlite database under ~/.cache/jpamb. A fresh
+hit hands the cached bytes straight to the parser and skips the
+read-and-hash of the source file; a stale or missing entry is re-read,
+re-hashed and replaced.
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+from pathlib import Path
+
+import tree_sitter
+
+_DB_PATH = Path.home() / ".cache" / "jpamb" / "ast.sqlite"
+
+_conn: sqlite3.Connection | None = None
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(_DB_PATH)
+        _conn.execute(
+            """CREATE TABLE IF NOT EXISTS ast (
+                path TEXT,
+                sha TEXT,
+                mtime_ns INTEGER,
+                blob BLOB,
+                PRIMARY KEY (path, sha)
+            )"""
+        )
+    return _conn
+
+def get_tree(path: Path, parser: tree_sitter.Parser) -> tree_sitter.Tree:
+    """Parse the java source at `path`, reusing the cached blob when fresh."""
+    con = _connect()
+    key = str(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    row = con.execute(
+        "SELECT blob FROM ast WHERE path = ? AND mtime_ns = ?", (key, mtime_ns)
+    ).fetchone()
+    if row is not None:
+        return parser.parse(row[0])
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sha = hashlib.sha256(mm).hexdigest()
+            data = bytes(mm)
+
+    con.execute("DELETE FROM ast WHERE path = ?", (key,))
+    con.execute(
+        "INSERT INTO ast (path, sha, mtime_ns, blob) VALUES (?, ?, ?, ?)",
+        (key, sha, mtime_ns, data),
+    )
+    con.commit()
+    return parser.parse(data)
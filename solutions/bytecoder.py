@@ -24,13 +24,13 @@ log.debug("looking up method")
 m = jpamb.Suite().findmethod(methodid)
 
 log.debug("trying to find an assertion error being created")
-for inst in m["code"]["bytecode"]:
-    if (
-        inst["opr"] == "invoke"
-        and inst["method"]["ref"]["name"] == "java/lang/AssertionError"
-    ):
-        break
-else:
+# any() short-circuits at C speed over the generator
+found = any(
+    inst["opr"] == "invoke"
+    and inst["method"]["ref"]["name"] == "java/lang/AssertionError"
+    for inst in m["code"]["bytecode"]
+)
+if not found:
     # I'm pretty sure the answer is no
     log.debug("did not find it")
     print("assertion error;20%")
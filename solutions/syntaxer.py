@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """A very stupid syntatic analysis, that only checks for assertion errors."""
 
+import functools
 import logging
 import tree_sitter
 import tree_sitter_java
@@ -8,127 +9,64 @@ import jpamb
 import sys
 from pathlib import Path
 
-
-methodid = jpamb.getmethodid(
-    "syntaxer",
-    "1.0",
-    "The Rice Theorem Cookers",
-    ["syntatic", "python"],
-    for_science=True,
-)
+import _parse_cache
 
 
 JAVA_LANGUAGE = tree_sitter.Language(tree_sitter_java.language())
 parser = tree_sitter.Parser(JAVA_LANGUAGE)
 
-log = logging
-log.basicConfig(level=logging.DEBUG)
+# the working directory does not change over a run, so resolve it once
+_CWD = Path.cwd()
 
 
-srcfile = jpamb.sourcefile(methodid).relative_to(Path.cwd())
+@functools.lru_cache(maxsize=None)
+def get_query(src: str) -> tree_sitter.Query:
+    """Compile a query once per source string.
 
-with open(srcfile, "rb") as f:
-    log.debug("parse sourcefile %s", srcfile)
-    tree = parser.parse(f.read())
+    Query compilation is a big slice of a run, so the queries below are
+    plain source-string constants and only hit the compiler on first
+    use.
+    """
+    return tree_sitter.Query(JAVA_LANGUAGE, src)
 
-simple_classname = str(methodid.classname.name)
+log = logging
+log.basicConfig(level=logging.DEBUG)
 
-log.debug(f"{simple_classname}")
 
 # To figure out how to write these you can consult the
 # https://tree-sitter.github.io/tree-sitter/playground
-class_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
-    f"""
-    (class_declaration 
-        name: ((identifier) @class-name 
-               (#eq? @class-name "{simple_classname}"))) @class
-""",
-)
-
-for node in tree_sitter.QueryCursor(class_q).captures(tree.root_node)["class"]:
-    break
-else:
-    log.error(f"could not find a class of name {simple_classname} in {srcfile}")
-
-    sys.exit(-1)
-
-# log.debug("Found class %s", node.range)
-
-method_name = methodid.extension.name
-
-method_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
-    f"""
-    (method_declaration name: 
-      ((identifier) @method-name (#eq? @method-name "{method_name}"))
-    ) @method
-""",
-)
-
-for node in tree_sitter.QueryCursor(method_q).captures(node)["method"]:
-
-    if not (p := node.child_by_field_name("parameters")):
-        log.debug(f"Could not find parameteres of {method_name}")
-        continue
-
-    params = [c for c in p.children if c.type == "formal_parameter"]
-
-    if len(params) != len(methodid.extension.params):
-        continue
-
-    log.debug(methodid.extension.params)
-    log.debug(params)
-
-    for tn, t in zip(methodid.extension.params, params):
-        if (tp := t.child_by_field_name("type")) is None:
-            break
-
-        if tp.text is None:
-            break
-
-        # todo check for type.
-    else:
-        break
-else:
-    log.warning(f"could not find a method of name {method_name} in {simple_classname}")
-    sys.exit(-1)
-
-log.debug("Found method %s %s", method_name, node.range)
-
-body = node.child_by_field_name("body")
-assert body and body.text
-for t in body.text.splitlines():
-    log.debug("line: %s", t.decode())
-
-assert_q = tree_sitter.Query(JAVA_LANGUAGE, """(assert_statement) @assert""")
-assert_false_q = tree_sitter.Query(
-    JAVA_LANGUAGE, 
-    """
+#
+# The class and method queries keep their source constant (so the
+# compiled query is shared between invocations) and filter on the
+# captured name in Python instead of interpolating it into the query.
+class_q = """
+    (class_declaration
+        name: (identifier) @class-name) @class
+"""
+
+method_q = """
+    (method_declaration
+        name: (identifier) @method-name) @method
+"""
+
+assert_q = """(assert_statement) @assert"""
+assert_false_q = """
       ((assert_statement (false) @assert-false))
-      """)
-assert_true_q = tree_sitter.Query(
-    JAVA_LANGUAGE, 
-    """
+      """
+assert_true_q = """
       ((assert_statement (true) @assert-true))
-      """)
+      """
 
-divide_by_zero_q = tree_sitter.Query(
-    JAVA_LANGUAGE, 
-    """(binary_expression operator: "/" right: (decimal_integer_literal) @rhs(#eq? @rhs "0")) 
-    @divide_by_zero""")
+divide_by_zero_q = """(binary_expression operator: "/" right: (decimal_integer_literal) @rhs(#eq? @rhs "0"))
+    @divide_by_zero"""
 
 
 #todo handle a / b cases or 1 / n cases
-divide_by_one_variable_q = tree_sitter.Query(
-    JAVA_LANGUAGE, 
-    """(binary_expression operator: "/" right: (identifier) @rhs) 
-    @divide_by_one_variable""")
+divide_by_one_variable_q = """(binary_expression operator: "/" right: (identifier) @rhs)
+    @divide_by_one_variable"""
 
 
-infinite_loop_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
-    """
+infinite_loop_q = """
     (
       (while_statement
         condition: (parenthesized_expression
@@ -136,11 +74,9 @@ infinite_loop_q = tree_sitter.Query(
         body: (_) @loop-body
       ) @infinite-loop
     )
-    """)
-
-null_array_decl_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
     """
+
+null_array_decl_q = """
     (
       (local_variable_declaration
         declarator: (variable_declarator
@@ -148,11 +84,9 @@ null_array_decl_q = tree_sitter.Query(
         )
       ) @null-array-decl
     )
-    """)
-
-array_access_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
     """
+
+array_access_q = """
     (
       (array_access
         array: (identifier) @array-name
@@ -160,27 +94,21 @@ array_access_q = tree_sitter.Query(
       ) @array-access
     )
     """
-)
 
 #todo: handle new int[]
-array_access_with_new_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
-    """
+array_access_with_new_q = """
     (
       (array_access
         array: (new_array
                  type: (identifier) @array-type
                  size: (_) @array-size
-               ) 
+               )
         index: (_) @field_value
       ) @array-access-new
     )
     """
-)
 
-array_length_q = tree_sitter.Query(
-    JAVA_LANGUAGE,
-    """
+array_length_q = """
     (
       (field_access
         object: (identifier) @array-name
@@ -188,7 +116,6 @@ array_length_q = tree_sitter.Query(
       ) @array-length
     )
     """
-)
 
 
 
@@ -202,83 +129,194 @@ array_length_q = tree_sitter.Query(
 #)
 
 
-
-null_array_decl_found = any(
-    capture_name == "null-array-decl"
-    for capture_name, _ in tree_sitter.QueryCursor(null_array_decl_q).captures(body).items()
+# All the checks above walk the same method subtree, so they are fused
+# into one query; a single captures() pass yields a dict keyed by
+# capture name and each verdict flag is a plain key lookup.
+unified_q = "\n".join(
+    [
+        assert_q,
+        assert_false_q,
+        assert_true_q,
+        divide_by_zero_q,
+        divide_by_one_variable_q,
+        infinite_loop_q,
+        null_array_decl_q,
+        array_access_q,
+        array_length_q,
+    ]
 )
 
-array_access_found = any(
-    capture_name == "array-access"
-    for capture_name, _ in tree_sitter.QueryCursor(array_access_q).captures(body).items()
-)
 
-array_length_found = any(
-    capture_name == "array-length"
-    for capture_name, _ in tree_sitter.QueryCursor(array_length_q).captures(body).items()
-)
+def analyze(methodid: jpamb.jvm.AbsMethodID) -> list[str]:
+    """Analyze one method and return its verdict lines.
 
-assert_found = any(
-    capture_name == "assert"
-    for capture_name, _ in tree_sitter.QueryCursor(assert_q).captures(body).items()
-)
+    The parser, language and compiled queries are module globals, so in
+    worker mode every invocation after the first reuses them for free.
+    Raises LookupError when the class or method cannot be found.
+    """
+    srcfile = jpamb.sourcefile(methodid).relative_to(_CWD)
 
-assert_false_found = any(
-    capture_name == "assert-false"
-    for capture_name, _ in tree_sitter.QueryCursor(assert_false_q).captures(body).items()
-)
+    log.debug("parse sourcefile %s", srcfile)
+    tree = _parse_cache.get_tree(srcfile, parser)
 
-assert_true_found = any(
-    capture_name == "assert-true"
-    for capture_name, _ in tree_sitter.QueryCursor(assert_true_q).captures(body).items()
-)
+    simple_classname = str(methodid.classname.name)
 
-divide_by_zero_found = any(
-    capture_name == "divide_by_zero"
-    for capture_name, _ in tree_sitter.QueryCursor(divide_by_zero_q).captures(body).items()
-)
+    log.debug(f"{simple_classname}")
 
-divide_by_one_variable_found = any(
-    capture_name == "divide_by_one_variable"
-    for capture_name, _ in tree_sitter.QueryCursor(divide_by_one_variable_q).captures(body).items()
-)
+    for node in tree_sitter.QueryCursor(get_query(class_q)).captures(
+        tree.root_node
+    ).get("class", []):
+        name = node.child_by_field_name("name")
+        if name and name.text and name.text.decode() == simple_classname:
+            break
+    else:
+        log.error(f"could not find a class of name {simple_classname} in {srcfile}")
+        raise LookupError(simple_classname)
 
-infinite_loop_found = any(
-    capture_name == "infinite-loop"
-    for capture_name, _ in tree_sitter.QueryCursor(infinite_loop_q).captures(body).items()
-)
+    # log.debug("Found class %s", node.range)
+
+    method_name = methodid.extension.name
+    expected_params = methodid.extension.params
+    expected_len = len(expected_params)
+
+    for node in tree_sitter.QueryCursor(get_query(method_q)).captures(node).get(
+        "method", []
+    ):
+        name = node.child_by_field_name("name")
+        if not (name and name.text and name.text.decode() == method_name):
+            continue
+
+        if not (p := node.child_by_field_name("parameters")):
+            log.debug(f"Could not find parameteres of {method_name}")
+            continue
 
+        params = [c for c in p.children if c.type == "formal_parameter"]
 
+        if len(params) != expected_len:
+            continue
 
-if null_array_decl_found and (array_access_found or array_length_found):
-    log.debug("Found null array dereference")
-    print("null pointer;70%")
-else:
-    log.debug("No null array dereference")
-    print("null pointer;0%")
-
-if infinite_loop_found:
-    log.debug("Found infinite loop")
-    print("*;100%")
-else:
-    log.debug("No infinite loop")
-    print("*;0%")
-
-if divide_by_zero_found:
-    log.debug("Found divide by zero")
-    print("divide by zero error;100%")
-else:
-    log.debug("No divide by zero")
-    print("divide by zero error;0%")
-
-if assert_false_found:
-    log.debug("Found false assertion")
-    print("assertion error;100%")
-elif assert_found:
-    log.debug("Found assertion")
-    print("assertion error;50%")
-else:
-    log.debug("No assertion")
-    print("assertion error;0%")
-
-sys.exit(0)
\ No newline at end of file
+        log.debug(expected_params)
+        log.debug(params)
+
+        for tn, t in zip(expected_params, params):
+            if (tp := t.child_by_field_name("type")) is None:
+                break
+
+            if tp.text is None:
+                break
+
+            # todo check for type.
+        else:
+            break
+    else:
+        log.warning(
+            f"could not find a method of name {method_name} in {simple_classname}"
+        )
+        raise LookupError(method_name)
+
+    log.debug("Found method %s %s", method_name, node.range)
+
+    body = node.child_by_field_name("body")
+    assert body and body.text
+    for t in body.text.splitlines():
+        log.debug("line: %s", t.decode())
+
+    # cheap byte pre-scan before walking the tree: each pattern needs one
+    # of these literals in the source text ("length" covers the
+    # field-access pattern), and bytes.__contains__ is a C-level scan, so
+    # bodies without any of them skip the query pass entirely
+    src = body.text
+    if (
+        b"assert" in src
+        or b"/" in src
+        or b"while" in src
+        or b"null" in src
+        or b"[" in src
+        or b"length" in src
+    ):
+        captures = tree_sitter.QueryCursor(get_query(unified_q)).captures(body)
+    else:
+        captures = {}
+
+    null_array_decl_found = "null-array-decl" in captures
+    array_access_found = "array-access" in captures
+    array_length_found = "array-length" in captures
+    assert_found = "assert" in captures
+    assert_false_found = "assert-false" in captures
+    assert_true_found = "assert-true" in captures
+    divide_by_zero_found = "divide_by_zero" in captures
+    divide_by_one_variable_found = "divide_by_one_variable" in captures
+    infinite_loop_found = "infinite-loop" in captures
+
+    verdicts = []
+
+    if null_array_decl_found and (array_access_found or array_length_found):
+        log.debug("Found null array dereference")
+        verdicts.append("null pointer;70%")
+    else:
+        log.debug("No null array dereference")
+        verdicts.append("null pointer;0%")
+
+    if infinite_loop_found:
+        log.debug("Found infinite loop")
+        verdicts.append("*;100%")
+    else:
+        log.debug("No infinite loop")
+        verdicts.append("*;0%")
+
+    if divide_by_zero_found:
+        log.debug("Found divide by zero")
+        verdicts.append("divide by zero error;100%")
+    else:
+        log.debug("No divide by zero")
+        verdicts.append("divide by zero error;0%")
+
+    if assert_false_found:
+        log.debug("Found false assertion")
+        verdicts.append("assertion error;100%")
+    elif assert_found:
+        log.debug("Found assertion")
+        verdicts.append("assertion error;50%")
+    else:
+        log.debug("No assertion")
+        verdicts.append("assertion error;0%")
+
+    return verdicts
+
+
+def serve() -> None:
+    """Read methodids from stdin, one per line, and emit verdicts.
+
+    Keeps the process (and with it the language, parser, query cache
+    and source cache) alive across methods, so only the first request
+    pays the startup cost.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            print("\n".join(analyze(jpamb.parse_methodid(line))))
+        except LookupError:
+            print("")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve()
+        sys.exit(0)
+
+    methodid = jpamb.getmethodid(
+        "syntaxer",
+        "1.0",
+        "The Rice Theorem Cookers",
+        ["syntatic", "python"],
+        for_science=True,
+    )
+    try:
+        for verdict in analyze(methodid):
+            print(verdict)
+    except LookupError:
+        sys.exit(-1)
+    sys.exit(0)
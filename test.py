@@ -1,12 +1,17 @@
 import jpamb
 from jpamb import jvm
 from dataclasses import dataclass
+import operator
 
 import sys
 from loguru import logger
 
 logger.remove()
-logger.add(sys.stderr, format="[{level}] {message}")
+logger.add(sys.stderr, format="[{level}] {message}", level="INFO")
+
+# checked once so the hot loop skips the f-string entirely when the
+# sink filters DEBUG records anyway
+DEBUG = logger._core.min_level <= 10
 
 methodid, input = jpamb.getcase()
 
@@ -30,43 +35,37 @@ class PC:
 @dataclass
 class Bytecode:
     suite: jpamb.Suite
-    methods: dict[jvm.AbsMethodID, list[jvm.Opcode]]
-
-    def __getitem__(self, pc: PC) -> jvm.Opcode:
-        try:
-            opcodes = self.methods[pc.method]
-        except KeyError:
-            opcodes = list(self.suite.method_opcodes(pc.method))
-            self.methods[pc.method] = opcodes
+    methods: dict[jvm.AbsMethodID, tuple[jvm.Opcode, ...]]
 
-        return opcodes[pc.offset]
+    def method_opcodes(self, method: jvm.AbsMethodID) -> tuple[jvm.Opcode, ...]:
+        opcodes = self.methods.get(method)
+        if opcodes is None:
+            opcodes = tuple(self.suite.method_opcodes(method))
+            self.methods[method] = opcodes
+        return opcodes
 
+    def __getitem__(self, pc: PC) -> jvm.Opcode:
+        return self.method_opcodes(pc.method)[pc.offset]
 
-@dataclass
-class Stack[T]:
-    items: list[T]
 
-    def __bool__(self) -> bool:
-        return len(self.items) > 0
+class Stack[T](list):
+    """A stack that is the list: push/pop/peek go straight to the
+    C-level list ops instead of through a wrapper attribute, and pop
+    and truthiness are inherited outright."""
 
     @classmethod
     def empty(cls):
-        return cls([])
+        return cls()
 
     def peek(self) -> T:
-        return self.items[-1]
-
-    def pop(self) -> T:
-        return self.items.pop(-1)
+        return self[-1]
 
     def push(self, value):
-        self.items.append(value)
+        self.append(value)
         return self
 
     def __str__(self):
-        if not self:
-            return "ϵ"
-        return "".join(f"{v}" for v in self.items)
+        return "".join(map(str, self)) if self else "ϵ"
 
 
 suite = jpamb.Suite()
@@ -75,16 +74,29 @@ bc = Bytecode(suite, dict())
 
 @dataclass
 class Frame:
-    locals: dict[int, jvm.Value]
+    # local slots are small dense ints, so a list indexes straight to
+    # the value where the old dict paid hashing on every load/store
+    locals: list[jvm.Value | None]
     stack: Stack[jvm.Value]
     pc: PC
+    # resolved once per frame so the step loop indexes a tuple instead
+    # of hashing the method id into the bytecode cache every step
+    opcodes: tuple[jvm.Opcode, ...]
+
+    def set_local(self, i: int, value: jvm.Value) -> None:
+        locals = self.locals
+        while len(locals) <= i:
+            locals.append(None)
+        locals[i] = value
 
     def __str__(self):
-        locals = ", ".join(f"{k}:{v}" for k, v in sorted(self.locals.items()))
+        locals = ", ".join(
+            f"{k}:{v}" for k, v in enumerate(self.locals) if v is not None
+        )
         return f"<{{{locals}}}, {self.stack}, {self.pc}>"
 
     def from_method(method: jvm.AbsMethodID) -> "Frame":
-        return Frame({}, Stack.empty(), PC(method, 0))
+        return Frame([], Stack.empty(), PC(method, 0), bc.method_opcodes(method))
 
 
 @dataclass
@@ -96,234 +108,278 @@ class State:
         return f"{self.heap} {self.frames}"
 
 
-def step(state: State) -> State | str:
-    assert isinstance(state, State), f"expected frame but got {state}"
-    frame = state.frames.peek()
-    opr = bc[frame.pc]
-    logger.debug(f"STEP {opr}\n{state}")
+def _step_push(opr, state: State, frame: Frame) -> State | str:
+    frame.stack.push(opr.value)
+    frame.pc += 1
+    return state
+
+
+def _step_load(opr, state: State, frame: Frame) -> State | str:
+    if not isinstance(opr.type, jvm.Int):
+        raise NotImplementedError(f"Don't know how to handle: {opr!r}")
+    frame.stack.push(frame.locals[opr.index])
+    frame.pc += 1
+    return state
+
+
+_BIN_OPS = {
+    jvm.BinaryOpr.Add: operator.add,
+    jvm.BinaryOpr.Sub: operator.sub,
+    jvm.BinaryOpr.Mul: operator.mul,
+    jvm.BinaryOpr.Div: operator.floordiv,
+}
+
+
+def _step_binary(opr, state: State, frame: Frame) -> State | str:
+    if not isinstance(opr.type, jvm.Int):
+        raise NotImplementedError(f"Don't know how to handle: {opr!r}")
+    v2, v1 = frame.stack.pop(), frame.stack.pop()
+    assert v1.type is jvm.Int(), f"expected int, but got {v1}"
+    assert v2.type is jvm.Int(), f"expected int, but got {v2}"
+
+    # only division cares about a zero right operand; the old code
+    # returned "divide by zero" for any operation with v2 == 0
+    operant = opr.operant
+    if operant is jvm.BinaryOpr.Div and v2.value == 0:
+        return "divide by zero"
+
+    # unhandled operants fall through without a push, as the old match did
+    if (op := _BIN_OPS.get(operant)) is not None:
+        frame.stack.push(jvm.Value.int(op(v1.value, v2.value)))
+    frame.pc += 1
+    return state
+
 
-    match opr:
-        case jvm.Push(value=v):
-            frame.stack.push(v)
+def _step_get(opr, state: State, frame: Frame) -> State | str:
+    field = opr.field
+    assert (field.extension.name == "$assertionsDisabled"), f"unknown field {field}"
+    frame.stack.push(jvm.Value.boolean(False))
+    frame.pc += 1
+    return state
+
+
+def _step_ifz(opr, state: State, frame: Frame) -> State | str:
+    t, c = opr.target, opr.condition
+    assert c in ("ne", "gt", "lt", "eq", "ge", "le"), f"unknown condition {c}"
+    assert isinstance(t, int), f"unknown target {t}"
+
+    # if t <= frame.pc.offset:
+    #     return "*"
+
+    v1 = frame.stack.pop()
+    match c:
+        case "ne" if not v1.value:
             frame.pc += 1
-            return state
-        
-        case jvm.Load(type=jvm.Int(), index=i):
-            frame.stack.push(frame.locals[i])
+        case "gt" if v1.value > 0:
             frame.pc += 1
-            return state
-        
-        case jvm.Binary(type=jvm.Int(), operant=operant):
-            v2, v1 = frame.stack.pop(), frame.stack.pop()
-            assert v1.type is jvm.Int(), f"expected int, but got {v1}"
-            assert v2.type is jvm.Int(), f"expected int, but got {v2}"
-            if v2.value == 0:
-                return "divide by zero"
-            
-            match operant:
-                case jvm.BinaryOpr.Div:
-                    if v2.value == 0:
-                        return "divide by zero"
-                    else:
-                        frame.stack.push(jvm.Value.int(v1.value // v2.value))
-
-                case jvm.BinaryOpr.Mul:
-                    frame.stack.push(jvm.Value.int(v1.value * v2.value))
-                
-                case jvm.BinaryOpr.Sub:
-                    frame.stack.push(jvm.Value.int(v1.value - v2.value))
-
-                case jvm.BinaryOpr.Add:
-                    frame.stack.push(jvm.Value.int(v1.value + v2.value))
-
+        case "lt" if v1.value < 0:
             frame.pc += 1
-            return state
-        
-        case jvm.Get(field=field):
-            assert (field.extension.name == "$assertionsDisabled"), f"unknown field {field}"
-            frame.stack.push(jvm.Value.boolean(False))
+        case "eq" if v1.value:
             frame.pc += 1
-            return state
-        
-        case jvm.Ifz(target=t, condition=c):
-            assert c in ("ne", "gt", "lt", "eq", "ge", "le"), f"unknown condition {c}"
-            assert isinstance(t, int), f"unknown target {t}"
-
-            # if t <= frame.pc.offset:
-            #     return "*"
-
-            v1 = frame.stack.pop()
-            print("IFZ:", v1, v1.value, c, t)
-            match c:
-                case "ne" if not v1.value:
-                    frame.pc += 1
-                case "gt" if v1.value > 0:
-                    frame.pc += 1
-                case "lt" if v1.value < 0:
-                    frame.pc += 1
-                case "eq" if v1.value:
-                    frame.pc += 1
-                case "ge" if v1.value >= 0:
-                    frame.pc += 1
-                case "le" if v1.value <= 0:
-                    frame.pc += 1
-                case _:
-                    frame.pc = PC(frame.pc.method, t)
-            print("IF: True", v1.value > 0, c == "gt")
-            return state
-
-        case jvm.If(target=t, condition=c):
-            assert c in ("ne", "gt", "lt", "eq"), f"unknown condition {c}"
-            assert isinstance(t, int), f"unknown target {t}"
-
-            v1 = frame.stack.pop()
-            print("IF:", v1, v1.value, c)
-            match c:
-                case "ne" if not v1.value:
-                    frame.pc += 1
-                case "gt" if v1.value > 0:
-                    frame.pc += 1
-                case "lt" if v1.value < 0:
-                    frame.pc += 1
-                case "eq" if v1.value:
-                    frame.pc += 1
-                case _:
-                    frame.pc = PC(frame.pc.method, t)
-            return state
-        
-        case jvm.New(classname=classname):
-            assert isinstance(classname, jvm.ClassName), f"unknown class {classname}"
-            print("NEW:", classname)
-            frame.stack.push(classname)
+        case "ge" if v1.value >= 0:
             frame.pc += 1
-            return state  
-
-        case jvm.Dup():
-            v1 = frame.stack.peek()
-            frame.stack.push(v1)
+        case "le" if v1.value <= 0:
             frame.pc += 1
-            return state
-        
-        ## Loops
-
-        case jvm.Goto(target=t):
-            assert isinstance(t, int), f"unknown target {t}"
+        case _:
             frame.pc = PC(frame.pc.method, t)
-            if frame.pc.offset == t:
-                return "*"
-            return state
-        
-        case jvm.Cast(from_=from_, to_=to_, ):
-            v1 = frame.stack.pop()
-            i = v1.value
-            print(to_)
+    return state
+
+
+def _step_if(opr, state: State, frame: Frame) -> State | str:
+    t, c = opr.target, opr.condition
+    assert c in ("ne", "gt", "lt", "eq"), f"unknown condition {c}"
+    assert isinstance(t, int), f"unknown target {t}"
 
+    v1 = frame.stack.pop()
+    match c:
+        case "ne" if not v1.value:
             frame.pc += 1
+        case "gt" if v1.value > 0:
+            frame.pc += 1
+        case "lt" if v1.value < 0:
+            frame.pc += 1
+        case "eq" if v1.value:
+            frame.pc += 1
+        case _:
+            frame.pc = PC(frame.pc.method, t)
+    return state
 
-            match to_: 
-                case jvm.Short():
-                    if i < -32768 or i > 32767:
-                        return "assertion error"
-                    frame.stack.push(i)
-                case _: 
-                    raise NotImplementedError(f"Don't know how to cast to {t}")
 
-            return state
+def _step_new(opr, state: State, frame: Frame) -> State | str:
+    classname = opr.classname
+    assert isinstance(classname, jvm.ClassName), f"unknown class {classname}"
+    frame.stack.push(classname)
+    frame.pc += 1
+    return state
 
-        ## Calls
 
-        case jvm.InvokeStatic(method=method):
-            frame.pc += 1
+def _step_dup(opr, state: State, frame: Frame) -> State | str:
+    v1 = frame.stack.peek()
+    frame.stack.push(v1)
+    frame.pc += 1
+    return state
 
-            # Extract arguments from the stack
-            num_params = len(method.extension.params)
-            args = [frame.stack.pop() for _ in range(num_params)][::-1]
-            print("INVOKE:", method, args)
 
-            # Create a new frame for the invoked method
-            new_frame = Frame.from_method(method)
+## Loops
 
-            # Initialize the new frame's local variables with the arguments
-            for i, arg in enumerate(args):
-                new_frame.locals[i] = arg
+def _step_goto(opr, state: State, frame: Frame) -> State | str:
+    t = opr.target
+    assert isinstance(t, int), f"unknown target {t}"
+    frame.pc = PC(frame.pc.method, t)
+    if frame.pc.offset == t:
+        return "*"
+    return state
 
 
-            new_state = State({}, Stack.empty().push(new_frame))
+def _step_cast(opr, state: State, frame: Frame) -> State | str:
+    to_ = opr.to_
+    v1 = frame.stack.pop()
+    i = v1.value
+    frame.pc += 1
 
-            for x in range(100000):
-                new_state = step(new_state)
-                if isinstance(new_state, str):
-                    print(new_state)
-                    break
-            else:
-                print("*")
-        ## Arrays 
+    match to_:
+        case jvm.Short():
+            if i < -32768 or i > 32767:
+                return "assertion error"
+            frame.stack.push(i)
+        case _:
+            raise NotImplementedError(f"Don't know how to cast to {to_}")
 
-        case jvm.NewArray(type=type, dim=dim):
-            frame.pc += 1
-            count = frame.stack.pop()
-            print("NEWARRAY:", type, dim, count)
-            assert count.type is jvm.Int(), f"expected int but got {count}"
-            assert count.value >= 0, f"array size must be non-negative but got {count}"
+    return state
 
-            a = jvm.Value.array(type, ([] * count.value) * dim)
-            frame.stack.push(jvm.Value.array(type, ([] * count.value) * dim))
-            return state
-        
-        case jvm.Store(type=type, index=i):
-            v1 = frame.stack.pop()
-            frame.locals[i] = v1
-            frame.pc += 1
-            return state
 
+## Calls
+
+def _step_invoke_static(opr, state: State, frame: Frame) -> State | str:
+    method = opr.method
+    frame.pc += 1
+
+    # Create a new frame for the invoked method
+    new_frame = Frame.from_method(method)
+
+    # Pop the arguments straight into their local slots, last parameter
+    # first, instead of materializing an args list plus a reversed copy
+    num_params = len(method.extension.params)
+    locals = new_frame.locals
+    locals.extend(None for _ in range(num_params))
+    pop = frame.stack.pop
+    for i in range(num_params - 1, -1, -1):
+        locals[i] = pop()
+
+    # Run the callee on the shared frame stack; jvm.Return pops back
+    # into this frame, so the single driver loop at the bottom bounds
+    # the whole execution instead of a nested interpreter per call.
+    state.frames.push(new_frame)
+    return state
 
-        
-        case jvm.InvokeSpecial(method=method):
-            frame.pc += 1
-            print("INVOKE:", method)
-            if method.classname == "java/lang/AssertionError" and method.name == "<init>":
-                return state
-            else:
-                frame.stack.pop()  # pop this
-            return state
-        
-        case jvm.Throw():
-            frame.pc += 1
-            v1 = frame.stack.pop()
-            assert isinstance(v1, jvm.ClassName), f"expected classname but got {v1}"   
-            frame.stack.empty()
-            print("THROW:", v1)
-            if str(v1) == "java/lang/AssertionError":
-                return "assertion error"
-            return str(v1)
 
-        case jvm.Return(type=jvm.Int()):
-            v1 = frame.stack.pop()
-            assert v1.type is jvm.Int(), f"expected int but got {v1}"
+## Arrays
 
-            state.frames.pop()
+_ARRAY_ZERO = {jvm.Int(): 0, jvm.Boolean(): False}
 
-            if state.frames:
-                frame = state.frames.peek()
-                frame.stack.push(v1)
-                frame.pc += 1
-                return state
-            else:
-                return "ok"
-        
-        case jvm.Return():
-                return "ok"
-        
 
-        case a:
-            raise NotImplementedError(f"Don't know how to handle: {a!r}")
-            sys.exit(f"Don't know how to handle: {a!r}")
+def _step_new_array(opr, state: State, frame: Frame) -> State | str:
+    type, dim = opr.type, opr.dim
+    frame.pc += 1
+    count = frame.stack.pop()
+    assert count.type is jvm.Int(), f"expected int but got {count}"
+    assert count.value >= 0, f"array size must be non-negative but got {count}"
+
+    # ([] * count) * dim was always the empty list; zero-initialize the
+    # array to its real size and build the Value once
+    zero = _ARRAY_ZERO.get(type)
+    frame.stack.push(jvm.Value.array(type, [zero] * (count.value * dim)))
+    return state
+
+
+def _step_store(opr, state: State, frame: Frame) -> State | str:
+    v1 = frame.stack.pop()
+    frame.set_local(opr.index, v1)
+    frame.pc += 1
+    return state
+
+
+def _step_invoke_special(opr, state: State, frame: Frame) -> State | str:
+    method = opr.method
+    frame.pc += 1
+    if method.classname == "java/lang/AssertionError" and method.name == "<init>":
+        return state
+    else:
+        frame.stack.pop()  # pop this
+    return state
+
+
+def _step_throw(opr, state: State, frame: Frame) -> State | str:
+    frame.pc += 1
+    v1 = frame.stack.pop()
+    assert isinstance(v1, jvm.ClassName), f"expected classname but got {v1}"
+    frame.stack.empty()
+    if str(v1) == "java/lang/AssertionError":
+        return "assertion error"
+    return str(v1)
+
+
+def _step_return(opr, state: State, frame: Frame) -> State | str:
+    if isinstance(opr.type, jvm.Int):
+        v1 = frame.stack.pop()
+        assert v1.type is jvm.Int(), f"expected int but got {v1}"
+
+        state.frames.pop()
+
+        # the caller's pc was already advanced by the invoke, so just
+        # hand the result back
+        if state.frames:
+            state.frames.peek().stack.push(v1)
+            return state
+        else:
+            return "ok"
+
+    state.frames.pop()
+    if state.frames:
+        return state
+    return "ok"
+
+
+# One small function per opcode, dispatched on the exact opcode type:
+# a dict lookup replaces the sequential pattern-match scan that ran for
+# every single instruction.
+HANDLERS = {
+    jvm.Push: _step_push,
+    jvm.Load: _step_load,
+    jvm.Binary: _step_binary,
+    jvm.Get: _step_get,
+    jvm.Ifz: _step_ifz,
+    jvm.If: _step_if,
+    jvm.New: _step_new,
+    jvm.Dup: _step_dup,
+    jvm.Goto: _step_goto,
+    jvm.Cast: _step_cast,
+    jvm.InvokeStatic: _step_invoke_static,
+    jvm.NewArray: _step_new_array,
+    jvm.Store: _step_store,
+    jvm.InvokeSpecial: _step_invoke_special,
+    jvm.Throw: _step_throw,
+    jvm.Return: _step_return,
+}
+
+
+def step(state: State) -> State | str:
+    assert isinstance(state, State), f"expected frame but got {state}"
+    frame = state.frames.peek()
+    opr = frame.opcodes[frame.pc.offset]
+    if DEBUG:
+        logger.debug(f"STEP {opr}\n{state}")
+
+    handler = HANDLERS.get(type(opr))
+    if handler is None:
+        raise NotImplementedError(f"Don't know how to handle: {opr!r}")
+    return handler(opr, state, frame)
 
 
 frame = Frame.from_method(methodid)
 for i, v in enumerate(input.values):
     print("INIT:", i, v)
-    frame.locals[i] = v
+    frame.set_local(i, v)
 
 state = State({}, Stack.empty().push(frame))
 
@@ -0,0 +1,199 @@
+# Pytest-style tests for the Interval domain in the repo's canonical
+# abstraction file `jpamb/abstract_mwa_and_poly.py`.
+
+import itertools
+import math
+
+from jpamb.abstract_mwa_and_poly import Interval, IntervalArray
+
+INF = math.inf
+
+
+def test_mul_zero_times_infinite_fast_path():
+    # regression: 0 * inf in the sign-determined cases used to produce
+    # a nan bound, which is neither bottom nor comparable
+    r = Interval(0, 0) * Interval(1, INF)
+    assert (r.low, r.high) == (0, 0)
+
+    r = Interval(0, 5) * Interval(2, INF)
+    assert (r.low, r.high) == (0, INF)
+
+    r = Interval(-INF, 0) * Interval(3, 4)
+    assert (r.low, r.high) == (-INF, 0)
+
+
+def test_mul_zero_times_infinite_corner_products():
+    # regression: the straddling-zero fallback selected a nan corner
+    # product whenever the comparison against it was False
+    r = Interval(0, 5) * Interval(-3, INF)
+    assert (r.low, r.high) == (-15, INF)
+
+    r = Interval(-2, 0) * Interval(-INF, 7)
+    assert (r.low, r.high) == (-14, INF)
+
+    r = Interval(-1, 1) * Interval(-INF, INF)
+    assert (r.low, r.high) == (-INF, INF)
+
+
+def test_mul_no_nan_bounds_and_printable():
+    cases = [
+        (Interval(0, 0), Interval(-INF, INF)),
+        (Interval(0, 3), Interval(-INF, 0)),
+        (Interval(-INF, 0), Interval(0, INF)),
+    ]
+    for a, b in cases:
+        r = a * b
+        assert not math.isnan(r.low) and not math.isnan(r.high)
+        repr(r)
+
+
+# -- lattice-operator properties ------------------------------------------
+
+
+def _leq(a: Interval, b: Interval) -> bool:
+    # a ⊑ b in the interval lattice
+    if a.is_bottom():
+        return True
+    if b.is_bottom():
+        return False
+    return b.low <= a.low and a.high <= b.high
+
+
+def test_widen_covers_join():
+    # soundness: widen(x, y) ⊒ x ⊔ y, or states get lost on back edges
+    for x in _grid():
+        for y in _grid():
+            assert _leq(x.join(y), x.widen(y)), f"widen({x!r}, {y!r})"
+
+
+def test_widen_is_reflexive():
+    for x in _grid():
+        assert x.widen(x) is x
+
+
+def test_widen_stabilizes():
+    # a strictly growing chain of iterates must hit a fixpoint after at
+    # most one widening step per threshold
+    w = Interval(0, 0)
+    steps = 0
+    for hi in [1, 7, 900, 2**20, 2**40, 2**70]:
+        nxt = w.widen(w.join(Interval(0, hi)))
+        if nxt != w:
+            steps += 1
+        w = nxt
+    assert steps <= 6
+    assert w.widen(w.join(Interval(0, 2**100))) == w
+
+
+def test_narrow_between_meet_and_original():
+    # a narrowing step refines x using y without going below x ⊓ y
+    for x in _grid():
+        for y in _grid():
+            if x.is_bottom() or y.is_bottom():
+                continue
+            z = x.narrow(y)
+            assert _leq(z, x), f"narrow({x!r}, {y!r}) = {z!r} not ⊑ x"
+            assert _leq(x.meet(y), z), f"narrow({x!r}, {y!r}) = {z!r} below meet"
+
+
+def test_bitwise_envelopes_contain_concrete_results():
+    # γ(x op y) must cover op applied to every concrete pair, including
+    # negative operands where the sign-extension envelope kicks in
+    import operator
+
+    span = range(-9, 10)
+    points = [-9, -8, -3, -1, 0, 1, 2, 7, 9]
+    boxes = [Interval(lo, hi) for lo in points for hi in points if lo <= hi]
+    for op in (operator.and_, operator.or_, operator.xor):
+        for x in boxes:
+            for y in boxes:
+                r = op(x, y)
+                for a in span:
+                    if not (x.low <= a <= x.high):
+                        continue
+                    for b in span:
+                        if not (y.low <= b <= y.high):
+                            continue
+                        assert r.low <= op(a, b) <= r.high, \
+                            f"{a} op {b} = {op(a, b)} outside {x!r} op {y!r} = {r!r}"
+
+
+def test_bitwise_envelope_regression_xor_negative():
+    # regression: the old envelope used only the highs, so [-1,-1]^[1,1]
+    # claimed [-1, 1] while the concrete result is -2
+    r = Interval(-1, -1) ^ Interval(1, 1)
+    assert r.low <= -2 <= r.high
+
+
+# -- IntervalArray agreement with the scalar operators --------------------
+#
+# The batch class is only correct insofar as each row matches what the
+# scalar Interval operator computes, so every batch op is checked
+# elementwise against its scalar counterpart over a grid that includes
+# infinite bounds and bottom.
+
+def _grid() -> list[Interval]:
+    # every shape the domain produces: finite, half-open either way,
+    # top and bottom — but not the degenerate [∞, ∞] singletons, which
+    # no abstraction step ever constructs
+    bounds = [-INF, -4, 0, 3, INF]
+    ivs = [Interval(lo, hi) for lo, hi in itertools.product(bounds, bounds)
+           if lo <= hi and not (lo == hi and math.isinf(lo))]
+    ivs.append(Interval.bottom())
+    return ivs
+
+
+def _canon(low: float, high: float) -> tuple[float, float]:
+    # both representations use the low > high convention for bottom;
+    # collapse it to the batch layout's canonical (+inf, -inf) pair
+    if low > high:
+        return (INF, -INF)
+    return (float(low), float(high))
+
+
+def _assert_batch_agrees(batch_op, scalar_op):
+    ivs = _grid()
+    pairs = list(itertools.product(ivs, ivs))
+    a = IntervalArray.of_intervals([p[0] for p in pairs])
+    b = IntervalArray.of_intervals([p[1] for p in pairs])
+    result = batch_op(a, b)
+    for i, (x, y) in enumerate(pairs):
+        s = scalar_op(x, y)
+        expected = _canon(s.low, s.high)
+        got = _canon(result.lows[i], result.highs[i])
+        assert got == expected, f"{x} op {y}: batch {got} != scalar {expected}"
+
+
+def test_interval_array_add_agrees_with_scalar():
+    _assert_batch_agrees(IntervalArray.add_batch, Interval.__add__)
+
+
+def test_interval_array_sub_agrees_with_scalar():
+    _assert_batch_agrees(IntervalArray.sub_batch, Interval.__sub__)
+
+
+def test_interval_array_mul_agrees_with_scalar():
+    _assert_batch_agrees(IntervalArray.mul_batch, Interval.__mul__)
+
+
+def test_interval_array_join_agrees_with_scalar():
+    _assert_batch_agrees(IntervalArray.join_batch, Interval.join)
+
+
+def test_interval_array_meet_agrees_with_scalar():
+    _assert_batch_agrees(IntervalArray.meet_batch, Interval.meet)
+
+
+def test_mul_matches_finite_corner_products():
+    vals = [-7, -1, 0, 2, 9]
+    for al in vals:
+        for ah in vals:
+            if al > ah:
+                continue
+            for bl in vals:
+                for bh in vals:
+                    if bl > bh:
+                        continue
+                    r = Interval(al, ah) * Interval(bl, bh)
+                    corners = [al * bl, al * bh, ah * bl, ah * bh]
+                    assert (r.low, r.high) == (min(corners), max(corners))
@@ -3,7 +3,9 @@
 import sys
 import os
 import importlib.util
-from jpamb.abstract_mwa import Bitfield
+import itertools
+import pytest
+from jpamb.abstract_mwa import Bitfield, BitfieldStore
 
 def test_bitfield_operations():
     """Test the Bitfield domain with 3-valued logic"""
@@ -128,6 +130,73 @@ def test_three_valued_logic():
         print(f"  {a} │ {result}")
 
 
+def _store_grid() -> list[Bitfield]:
+    # concrete values, partially unknown words and top, all at width 8
+    return [
+        Bitfield.of(0, 8),
+        Bitfield.of(5, 8),
+        Bitfield.of(0xF0, 8),
+        Bitfield.of(0xFF, 8),
+        Bitfield(tuple(["0", "0", "0", "0", "⊥", "1", "⊥", "1"]), 8),
+        Bitfield(tuple(["⊥", "1", "0", "⊥", "0", "0", "1", "⊥"]), 8),
+        Bitfield.top(8),
+    ]
+
+
+def _store_of(bfs: list[Bitfield]) -> BitfieldStore:
+    # one program point per bitfield, a single variable
+    return BitfieldStore([[bf.val] for bf in bfs],
+                         [[bf.unk] for bf in bfs], 8)
+
+
+def test_bitfield_store_agrees_with_scalar_ops():
+    """Every BitfieldStore op must match the scalar Bitfield op slotwise."""
+    grid = _store_grid()
+    pairs = list(itertools.product(grid, grid))
+    a = _store_of([p[0] for p in pairs])
+    b = _store_of([p[1] for p in pairs])
+
+    cases = [
+        (a.join(b), lambda x, y: x.join(y)),
+        (a & b, lambda x, y: x & y),
+        (a | b, lambda x, y: x | y),
+        (a ^ b, lambda x, y: x ^ y),
+        (~a, lambda x, y: ~x),
+    ]
+    for store_result, scalar_op in cases:
+        for i, (x, y) in enumerate(pairs):
+            assert store_result.get(i, 0) == scalar_op(x, y), \
+                f"{x!r} op {y!r} disagrees at slot {i}"
+
+
+def test_bitfield_store_meet_agrees_with_scalar():
+    # meet is partial, so only pair up compatible bitfields elementwise
+    grid = _store_grid()
+    pairs = [(x, y) for x, y in itertools.product(grid, grid)
+             if not ((x.val ^ y.val) & ~(x.unk | y.unk))]
+    a = _store_of([p[0] for p in pairs])
+    b = _store_of([p[1] for p in pairs])
+    result = a.meet(b)
+    for i, (x, y) in enumerate(pairs):
+        assert result.get(i, 0) == x.meet(y)
+
+
+def test_bitfield_store_meet_rejects_contradictions():
+    # one contradictory slot fails the whole meet, matching Bitfield.meet
+    a = _store_of([Bitfield.of(5, 8), Bitfield.of(1, 8)])
+    b = _store_of([Bitfield.of(5, 8), Bitfield.of(2, 8)])
+    with pytest.raises(ValueError):
+        a.meet(b)
+
+
+def test_bitfield_store_get_set_roundtrip():
+    store = BitfieldStore.top(2, 2, 8)
+    bf = Bitfield(tuple(["0", "⊥", "1", "0", "1", "⊥", "0", "1"]), 8)
+    store.set(1, 0, bf)
+    assert store.get(1, 0) == bf
+    assert store.get(0, 0) == Bitfield.top(8)
+
+
 if __name__ == "__main__":
     print("=" * 70)
     print("  Machine Word Abstract Domain - Bitfield Test Suite")
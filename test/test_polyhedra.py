@@ -43,3 +43,82 @@ def test_polyhedra_bottom_detection():
     p3 = Polyhedra()
     p3.add_constraint({}, -1.0)  # 0 <= -1 -> infeasible
     assert p3.is_bottom()
+
+
+def _box(**bounds):
+    # build a box polyhedron from var=(lo, hi) pairs; None leaves the
+    # end unbounded
+    p = Polyhedra()
+    for v, (lo, hi) in bounds.items():
+        if lo is not None:
+            p.add_constraint({v: -1.0}, -float(lo))
+        if hi is not None:
+            p.add_constraint({v: 1.0}, float(hi))
+    return p
+
+
+def _covers(outer, inner):
+    # outer ⊒ inner on the per-variable projections: every bound outer
+    # claims must also hold of inner, at least as tightly
+    bi = inner._compute_bounds()
+    for v, (lo, hi) in outer._compute_bounds().items():
+        ilo, ihi = bi.get(v, (None, None))
+        if lo is not None and (ilo is None or lo > ilo):
+            return False
+        if hi is not None and (ihi is None or hi < ihi):
+            return False
+    return True
+
+
+def test_polyhedra_widen_covers_join():
+    # soundness: the widened box must cover the join of the iterates
+    cases = [
+        (_box(x=(0, 10)), _box(x=(0, 20))),            # upper bound grew
+        (_box(x=(0, 10)), _box(x=(-5, 10))),           # lower bound grew
+        (_box(x=(0, 10), y=(1, 2)), _box(x=(0, 11), y=(0, 2))),
+        (_box(x=(0, 10)), _box(y=(0, 3))),             # disjoint vars
+    ]
+    for p, q in cases:
+        w = p.widen(q)
+        assert _covers(w, p.join(q))
+        assert _covers(w, p) and _covers(w, q)
+
+
+def test_polyhedra_widen_drops_moving_bounds():
+    # a bound that moved between iterates goes to unbounded, so repeated
+    # widening stabilizes instead of crawling
+    p = _box(x=(0, 10))
+    w = p.widen(_box(x=(0, 20)))
+    lo, hi = w._compute_bounds()["x"]
+    assert lo == 0.0 and hi is None
+    # stable against any further growth of the same bound
+    assert w.widen(w.join(_box(x=(0, 10 ** 9))))._compute_bounds() == \
+        w._compute_bounds()
+
+
+def test_polyhedra_widen_is_reflexive():
+    p = _box(x=(0, 10))
+    assert p.widen(p) is p
+
+
+def test_polyhedra_narrow_between_meet_and_original():
+    # narrowing refills the bounds widening dropped, without tightening
+    # past the post-widening iterate
+    p = _box(x=(0, 10))
+    w = p.widen(_box(x=(0, 20)))        # x >= 0, unbounded above
+    n = w.narrow(_box(x=(0, 20)))
+    assert _covers(w, n)                # n ⊑ w
+    assert _covers(n, w.meet(_box(x=(0, 20))))  # meet ⊑ n
+    assert n._compute_bounds()["x"] == (0.0, 20.0)
+
+
+def test_polyhedra_frozen_is_order_independent():
+    p = Polyhedra()
+    p.add_constraint({"x": 1.0}, 10.0)
+    p.add_constraint({"y": 1.0, "x": 2.0}, 5.0)
+    q = Polyhedra()
+    q.add_constraint({"x": 2.0, "y": 1.0}, 5.0)
+    q.add_constraint({"x": 1.0}, 10.0)
+    assert p.frozen() == q.frozen()
+    hash(p.frozen())
+    assert Polyhedra.bottom().frozen() != Polyhedra.top().frozen()
@@ -1,5 +1,5 @@
 from typing import Iterable, TypeVar
-import copy
+import sys
 import jpamb
 from jpamb import jvm
 from dataclasses import dataclass
@@ -7,6 +7,13 @@ from loguru import logger
 import sign
 from sign import SignSet
 
+logger.remove()
+logger.add(sys.stderr, format="[{level}] {message}", level="INFO")
+
+# checked once so the fixpoint loop skips the f-strings entirely when
+# the sink filters DEBUG records anyway
+DEBUG = logger._core.min_level <= 10
+
 
 
 T = TypeVar("T")
@@ -32,23 +39,22 @@ class Stack[T]:
         self.items.append(value)
         return self
 
+    def shallow_copy(self) -> "Stack[T]":
+        return Stack(list(self.items))
+
     def __str__(self):
         if not self:
             return "ϵ"
         return "".join(f"{v}" for v in self.items)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PC:
     method: jvm.AbsMethodID
     offset: int
 
-    def __hash__(self):
-        return hash((str(self.method), self.offset))
-
-    def __eq__(self, other):
-        if not isinstance(other, PC):
-            return False
-        return str(self.method) == str(other.method) and self.offset == other.offset
+    # AbsMethodID hashes and compares structurally, so the generated
+    # (method, offset) __hash__/__eq__ replace the old ones that built
+    # two method-id strings per dict probe
 
     def __add__(self, delta):
         return PC(self.method, self.offset + delta)
@@ -59,30 +65,73 @@ class PC:
 @dataclass
 class Bytecode:
     suite: jpamb.Suite
-    methods: dict[jvm.AbsMethodID, list[jvm.Opcode]]
+    methods: dict[jvm.AbsMethodID, tuple[jvm.Opcode, ...]]
+    succs: dict[jvm.AbsMethodID, tuple[tuple[int, ...], ...]]
 
-    def __getitem__(self, pc: PC) -> jvm.Opcode:
-        try:
-            opcodes = self.methods[pc.method]
-        except KeyError:
-            opcodes = list(self.suite.method_opcodes(pc.method))
-            self.methods[pc.method] = opcodes
+    def method_opcodes(self, method: jvm.AbsMethodID) -> tuple[jvm.Opcode, ...]:
+        opcodes = self.methods.get(method)
+        if opcodes is None:
+            opcodes = tuple(self.suite.method_opcodes(method))
+            self.methods[method] = opcodes
+        return opcodes
 
-        return opcodes[pc.offset]
+    def __getitem__(self, pc: PC) -> jvm.Opcode:
+        return self.method_opcodes(pc.method)[pc.offset]
+
+    def successors(self, method: jvm.AbsMethodID) -> tuple[tuple[int, ...], ...]:
+        """Successor offsets of every PC, computed once per method.
+
+        Control-flow passes (back-edge detection, reachability) index
+        this table instead of re-matching opcodes per visit.
+        """
+        succs = self.succs.get(method)
+        if succs is None:
+            out = []
+            for pc, op in enumerate(self.method_opcodes(method)):
+                match op:
+                    case jvm.Goto(target=t):
+                        out.append((t,))
+                    case jvm.Ifz(target=t) | jvm.If(target=t):
+                        out.append((t, pc + 1))
+                    case jvm.Return():
+                        out.append(())
+                    case _:
+                        out.append((pc + 1,))
+            succs = tuple(out)
+            self.succs[method] = succs
+        return succs
+
+    def backedge_targets(self, method: jvm.AbsMethodID) -> frozenset[int]:
+        """Offsets that are jumped to from later in the method."""
+        targets = set()
+        for pc, ss in enumerate(self.successors(method)):
+            for t in ss:
+                if t <= pc:
+                    targets.add(t)
+        return frozenset(targets)
 
 
 @dataclass
 class PerVarFrame:
+    # the operand stack is a plain list: push/pop/peek go straight to
+    # the C-level list ops instead of through the Stack wrapper, which
+    # stays in use only for the rarely-touched frames stack
     locals: dict[int, SignSet | jvm.Boolean]
-    stack: Stack[SignSet]
+    stack: list[SignSet]
     pc: PC
 
     def from_method(method: jvm.AbsMethodID) -> "PerVarFrame":
-        return PerVarFrame({}, Stack.empty(), PC(method, 0))
+        return PerVarFrame({}, [], PC(method, 0))
+
+    def clone(self) -> "PerVarFrame":
+        # the abstract values themselves (SignSet, PC) are immutable, so
+        # a copy of the containers is enough
+        return PerVarFrame(dict(self.locals), list(self.stack), self.pc)
     
     def __str__(self):
         locals = ", ".join(f"{k}:{v}" for k, v in self.locals.items())
-        return f"<{{{locals}}}, {self.stack}, {self.pc}>"
+        stack = "".join(map(str, self.stack)) if self.stack else "ϵ"
+        return f"<{{{locals}}}, {stack}, {self.pc}>"
 
 
 @dataclass
@@ -94,23 +143,57 @@ class A: # Abstract State
         frame: PerVarFrame = PerVarFrame.from_method(methodid)
         for i, v in enumerate(methodid.methodid.params._elements):
             if isinstance(v, jvm.Int):
-                frame.locals[i] = SignSet.TOP()
+                frame.locals[i] = SignSet.top()
             else: 
                 frame.locals[i] = v
         return A( Stack.empty().push(frame), PC(methodid, 0))
+
+    def clone(self) -> "A":
+        # only the top frame is mutated per step, so the outer frames are
+        # shared by reference and just the top is deep enough to touch
+        items = self.frames.items
+        return A(Stack(items[:-1] + [items[-1].clone()]), self.pc)
     
-    def __ior__(self, other: "A") -> None:
+    def merge(self, other: "A", widen: bool = False) -> bool:
+        """Merge `other` into this state in place.
+
+        Returns whether anything actually grew, which is what the
+        worklist uses to decide on re-processing. One pass over the
+        other side's entries; the old range(len - 1) loops dropped the
+        last local and stack slot and indexed both sides per key.
+        """
         assert self.pc == other.pc, "Cannot merge states with different program counters"
-        for i in range(len(self.frames.peek().locals)-1):
-            if isinstance(other.frames.peek().locals[i], SignSet) and isinstance(self.frames.peek().locals[i], SignSet):
-                self.frames.peek().locals[i] |= other.frames.peek().locals[i]
+        changed = False
+        self_top = self.frames.peek()
+        other_top = other.frames.peek()
+        sl = self_top.locals
+        for k, ov in other_top.locals.items():
+            sv = sl.get(k)
+            if isinstance(sv, SignSet) and isinstance(ov, SignSet):
+                nv = sv.widen(ov) if widen else sv.join(ov)
             else:
-                self.frames.peek().locals[i] = other.frames.peek().locals[i]
-        for i in range(len(self.frames.peek().stack.items)-1):
-            if isinstance(other.frames.peek().stack.items[i], SignSet) and isinstance(self.frames.peek().stack.items[i], SignSet):
-                self.frames.peek().stack.items[i] |= other.frames.peek().stack.items[i]
+                nv = ov
+            if nv is not sv and nv != sv:
+                sl[k] = nv
+                changed = True
+        ss = self_top.stack
+        for i, ov in enumerate(other_top.stack):
+            if i < len(ss):
+                sv = ss[i]
+                if isinstance(sv, SignSet) and isinstance(ov, SignSet):
+                    nv = sv.widen(ov) if widen else sv.join(ov)
+                else:
+                    nv = ov
+                if nv is not sv and nv != sv:
+                    ss[i] = nv
+                    changed = True
             else:
-                self.frames.peek().stack.items[i] = other.frames.peek().stack.items[i]
+                ss.append(ov)
+                changed = True
+        return changed
+
+    def __ior__(self, other: "A") -> "A":
+        self.merge(other)
         return self
     
     def advance_pc(self, delta: int = 1):
@@ -123,20 +206,34 @@ class A: # Abstract State
         
         
 
+# merges at a loop head only start widening after this many visits, so
+# the first few iterations keep the precision of the plain join
+WIDEN_DELAY = 3
+
+
 class StateSet[A]:
     per_inst : dict[PC, A]
     needswork : set[PC]
+    # offsets of loop heads; merges at these PCs widen instead of join
+    backedges : frozenset[int]
+    visits : dict[PC, int]
 
     def per_instruction(self):
-        for pc in self.needswork: 
+        # snapshot-and-clear: this sweep owns the pending PCs, and the
+        # driver's |= re-adds exactly those whose state actually grew
+        pending = list(self.needswork)
+        self.needswork.clear()
+        for pc in pending:
             yield (pc, self.per_inst[pc])
 
-    def __init__(self, a: A, pc: PC):
+    def __init__(self, a: A, pc: PC, backedges: frozenset[int] = frozenset()):
         self.per_inst = {pc: a}
         self.needswork = {pc}
+        self.backedges = backedges
+        self.visits = {}
 
-    def initialize(a: A, pc: PC) -> "StateSet[A]":
-        return StateSet(a, pc)
+    def initialize(a: A, pc: PC, backedges: frozenset[int] = frozenset()) -> "StateSet[A]":
+        return StateSet(a, pc, backedges)
 
     # sts |= astate
     def __ior__(self, astate: A) -> "StateSet[A]":
@@ -144,155 +241,177 @@ class StateSet[A]:
             self.per_inst[astate.pc] = astate
             self.needswork.add(astate.pc)
         else:
-            old = self.per_inst[astate.pc]
-            self.per_inst[astate.pc] |= astate
-            if old != self.per_inst[astate.pc]:
+            visits = self.visits.get(astate.pc, 0) + 1
+            self.visits[astate.pc] = visits
+            changed = self.per_inst[astate.pc].merge(
+                astate,
+                widen=visits > WIDEN_DELAY
+                and astate.pc.offset in self.backedges,
+            )
+            if changed:
                 self.needswork.add(astate.pc)
         return self
   
 
 
+# which sign bits make each Ifz condition true against zero
+_COND_ACCEPT = {
+    "eq": sign.ZERO,
+    "ne": sign.NEG | sign.POS,
+    "lt": sign.NEG,
+    "gt": sign.POS,
+    "ge": sign.POS | sign.ZERO,
+    "le": sign.NEG | sign.ZERO,
+}
+
+
+def _h_get(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    # assert (op.field.extension.name == "$assertionsDisabled"), f"unknown field {op.field}"
+    frame.stack.append(jvm.Value.boolean(False))
+    frame.pc = frame.pc + 1
+    s.pc = frame.pc
+    yield s
+
+
+def _h_push(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    frame.stack.append(op.value)
+    frame.pc = frame.pc + 1
+    s.pc = frame.pc
+    yield s
+
+
+def _h_load(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    # slots written by unmodeled opcodes (or of unmodeled types) load as
+    # None / bottom; the downstream handlers treat both as unknown and
+    # let the path die quietly instead of tracebacking
+    v = frame.locals.get(op.index)
+    if isinstance(op.type, jvm.Int) and not isinstance(v, SignSet):
+        v = SignSet.abstract_value(v)
+    frame.stack.append(v)
+    frame.pc = frame.pc + 1
+    s.pc = frame.pc
+    yield s
+
+
+def _h_return(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    if isinstance(op.type, jvm.Int):
+        v1 = frame.stack.pop()
+        s.frames.pop()
+        if s.frames:
+            s.frames.peek().stack.append(v1)
+            yield s
+        else:
+            yield "ok"
+    else:
+        s.frames.pop()
+        if s.frames:
+            yield s
+        else:
+            yield "ok"
+
+
+def _h_binary(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    oper = op.operant
+    v2, v1 = frame.stack.pop(), frame.stack.pop()
+    if DEBUG:
+        logger.debug(f"Binary operation {oper} on {v1} and {v2}, types {type(v1)}, {type(v2)}")
+    if v1 is None or v2 is None:
+        return
+    if isinstance(v1, jvm.Value):
+        v1: SignSet = SignSet.abstract_value(v1.value)
+    elif not isinstance(v1, SignSet):
+        # ints abstract exactly; anything unmodeled becomes bottom
+        v1 = SignSet.abstract_value(v1)
+    if isinstance(v2, jvm.Value):
+        v2: SignSet = SignSet.abstract_value(v2.value)
+    elif not isinstance(v2, SignSet):
+        v2 = SignSet.abstract_value(v2)
+    if oper == jvm.BinaryOpr.Div:
+        if '0' in v2.signs:
+            yield "divide by zero"
+            return
+        res = v1.div(v2)
+    elif oper == jvm.BinaryOpr.Add:
+        res = v1.add(v2)
+    elif oper == jvm.BinaryOpr.Sub:
+        res = v1.sub(v2)
+    elif oper == jvm.BinaryOpr.Mul:
+        res = v1.mult(v2)
+    elif oper == jvm.BinaryOpr.Rem:
+        if '0' in v2.signs:
+            yield "divide by zero"
+            return
+        res = v1.rem(v2)
+    else:
+        raise NotImplementedError(f"Unhandled integer binary op: {oper}")
+    frame.stack.append(res)
+    frame.pc = frame.pc + 1
+    s.pc = frame.pc
+    yield s
+
+
+def _h_ifz(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    v = frame.stack.pop()
+    if not isinstance(v, SignSet):
+        v = SignSet.abstract_value(v.value if isinstance(v, jvm.Value) else v)
+
+    # one mask test per branch direction instead of a loop over the
+    # signs that mutated frame.pc between yields
+    try:
+        accept = _COND_ACCEPT[op.condition]
+    except KeyError:
+        raise NotImplementedError(f"Unhandled ifz condition: {op.condition}")
+
+    taken = v.bits & accept
+    fall = v.bits & ~accept
+    if taken:
+        t = s.clone() if fall else s
+        t.set_pc(PC(frame.pc.method, op.target))
+        yield t
+    if fall:
+        s.set_pc(frame.pc + 1)
+        yield s
+
+
+def _h_default(op, s: A, frame: PerVarFrame) -> Iterable[A | str]:
+    if DEBUG:
+        logger.debug(f"Unhandled opcode {op}")
+    frame.pc = frame.pc + 1
+    s.pc = frame.pc
+    yield s
+
+
+# one dict lookup on the opcode's type instead of the isinstance chain
+# a match statement compiles to
+_HANDLERS = {
+    jvm.Get: _h_get,
+    jvm.Push: _h_push,
+    jvm.Load: _h_load,
+    jvm.Return: _h_return,
+    jvm.Binary: _h_binary,
+    jvm.Ifz: _h_ifz,
+}
+
+
 def manystep(sts: StateSet[A] ) -> Iterable[A | str]:
-    states = copy.deepcopy(sts)
-    for pc, state in states.per_instruction():
-        s = copy.deepcopy(state)
+    for pc, state in sts.per_instruction():
+        s = state.clone()
         frame = s.frames.peek()
-        # logger.info(f"STEP {pc} \n BC: {bc} \n STATE: {state} \n FRAME: {frame}")
-        logger.info(f"STEP {bc[pc]}")
-        
-        match bc[frame.pc]:
-            case jvm.Get(field=field):
-                # assert (field.extension.name == "$assertionsDisabled"), f"unknown field {field}"
-                frame.stack.push(jvm.Value.boolean(False))
-                frame.pc = frame.pc + 1
-                s.pc = frame.pc
-                yield state
-
-            case jvm.Push(value=v):
-                frame.stack.push(v)
-                frame.pc = frame.pc + 1
-                s.pc = frame.pc
-                yield s
-                
-            case jvm.Load(type=t, index=i):
-                v = frame.locals[i]
-                if isinstance(t, jvm.Int):
-                    frame.stack.push(v)
-                elif isinstance(t, jvm.Reference):
-                    frame.stack.push(v)
-                else:
-                    raise NotImplementedError(f"Unhandled load type: {t}")
-                frame.pc = frame.pc + 1
-                s.pc = frame.pc
-                yield s
-
-            case jvm.Return(type=jvm.Int()):
-                v1 = frame.stack.pop()
-                s.frames.pop()
-                if s.frames:
-                    s.frames.peek().stack.push(v1)
-                    yield s
-                else:
-                    yield "ok"
-                
-            case jvm.Return(type=None):
-                s.frames.pop()
-                if s.frames:
-                    yield s
-                else:
-                    yield "ok"
-
-            case jvm.Binary(operant=oper):
-                v2, v1 = frame.stack.pop(), frame.stack.pop()
-                logger.debug(f"Binary operation {oper} on {v1} and {v2}, types {type(v1)}, {type(v2)}")
-                if v1 is None or v2 is None:
-                    break
-                if isinstance(v1, jvm.Value | int):
-                    v1: SignSet = SignSet.abstract(v1.value)
-                if isinstance(v2, jvm.Value | int):
-                    v2: SignSet = SignSet.abstract(v2.value)
-                if oper == jvm.BinaryOpr.Div:
-                    if '0' in v2.signs:
-                        yield "divide by zero"
-                        return
-                    res = v1.div(v2)
-                elif oper == jvm.BinaryOpr.Add:
-                    res = v1.add(v2)
-                elif oper == jvm.BinaryOpr.Sub:
-                    res = v1.sub(v2)
-                elif oper == jvm.BinaryOpr.Mul:
-                    res = v1.mult(v2)
-                elif oper == jvm.BinaryOpr.Rem:
-                    if '0' in v2.signs:
-                        yield "divide by zero"
-                        return
-                    res = v1.rem(v2)
-                else:
-                    raise NotImplementedError(f"Unhandled integer binary op: {oper}")
-                frame.stack.push(res)
-                frame.pc = frame.pc + 1
-                s.pc = frame.pc
-                yield s
-      
-            case jvm.Ifz(condition=cond, target=target):
-                v = frame.stack.pop()
-
-                # if not isinstance(v, SignSet):
-                #     v: SignSet = SignSet.abstract(v)
-
-                # logger.debug(f"IFZ on {v.signs} with condition {cond}")
-                # logger.debug(f"Signs: {v}")
-
-                for sign in v.signs:
-                    match cond:
-                        case "eq":
-                            if sign == "0" :
-                                frame.pc = PC(frame.pc.method, target)
-                            else:
-                                frame.pc = frame.pc + 1
-                        case "ne":
-                            if sign != "0":
-                                frame.pc = PC(frame.pc.method, target) 
-                            else:
-                                frame.pc = frame.pc + 1
-                        case "lt":
-                            if sign == "-":
-                                frame.pc = PC(frame.pc.method, target)
-                            else:  
-                                frame.pc = frame.pc + 1
-                        case "gt":
-                            if sign == "+":
-                                frame.pc = PC(frame.pc.method, target)
-                            else:
-                                frame.pc = frame.pc + 1
-                        case "ge":
-                            if sign == "+" or sign == "0":
-                                frame.pc = PC(frame.pc.method, target)
-                            else:
-                                frame.pc = frame.pc + 1
-                        case "le":
-                            if sign == "-" or sign == "0":
-                                frame.pc = PC(frame.pc.method, target)
-                            else:
-                                frame.pc = frame.pc + 1
-                        case _:
-                            raise NotImplementedError(f"Unhandled ifz condition: {cond}")
-                    s.pc = frame.pc
-                    yield s
-
-
-            case _ : 
-                logger.info(f"Unhandled opcode {bc[pc]}")
-                frame.pc = frame.pc + 1
-                s.pc = frame.pc
-                yield s
-
+        op = bc[frame.pc]
+        if DEBUG:
+            logger.debug(f"STEP {op}")
+        for out in _HANDLERS.get(type(op), _h_default)(op, s, frame):
+            yield out
+            if out == "divide by zero":
+                # matches the old behavior of ending the sweep on the
+                # first definite error
+                return
 
 
 
 
 suite = jpamb.Suite()
-bc = Bytecode(suite, dict())
+bc = Bytecode(suite, dict(), dict())
    
 methodid, input = jpamb.getcase()
 logger.info(f"Analyzing method {methodid.extension}\n {methodid} with input {input} and {methodid.methodid.params._elements}")
@@ -301,16 +420,22 @@ logger.info(f"Analyzing method {methodid.extension}\n {methodid} with input {inp
 
 
 s = A.initialstate_from_method(methodid)
-sts: StateSet[A] = StateSet[A].initialize(s, PC(methodid, 0))
+sts: StateSet[A] = StateSet[A].initialize(
+    s, PC(methodid, 0), bc.backedge_targets(methodid)
+)
 
 logger.info(f"Initial state setup {sts}")
 
 final: set[str] = set()
-MAX_STEPS = 5
-for i in range(MAX_STEPS):
+# widening plus the did-it-grow worklist makes this converge; the
+# iteration cap is a pure safety net
+MAX_ITERS = 10_000
+iters = 0
+while sts.needswork and iters < MAX_ITERS:
+  iters += 1
   for s in manystep(sts):
-    if isinstance(s, A):
-        logger.info(f"Step {i}, program counter {s.pc.offset}")
+    if DEBUG and isinstance(s, A):
+        logger.debug(f"Sweep {iters}, program counter {s.pc.offset}")
     if isinstance(s, str):
       logger.info(f"Final state reached: {s}")
       final.add(s)